@@ -0,0 +1,106 @@
+import copy
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from schema_compiler import load_compiled
+from validate import build_validators, collect, load_schema, load_yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_PATH = ROOT / "dcs_yaml_schema.yaml"
+SOURCE_ROOT = ROOT / "dcs-world-schema"
+
+# Values that break a type, an enum or a pattern wherever they replace another
+REPLACEMENTS = (None, 42, 1.5, True, "", "not a kind", [], [42], {}, {"x": 1})
+
+
+def mutations(node, path=(), width=3):
+    """Yield (path, document) for single-step changes below node.
+
+    Only the first width children of each mapping or list are descended into,
+    which keeps long method and field lists from dominating the run.
+    """
+    if isinstance(node, dict):
+        for key in node:
+            without = dict(node)
+            del without[key]
+            yield (*path, "-", key), without
+        yield (*path, "+"), {**node, "unexpectedKey": 1}
+        children = list(node.items())
+    elif isinstance(node, list):
+        yield (*path, "+"), [*node, {"unexpected": True}]
+        children = list(enumerate(node))
+    else:
+        children = []
+    for key, child in children[:width]:
+        for value in REPLACEMENTS:
+            yield (*path, key, repr(value)), _replace(node, key, value)
+        for sub_path, changed in mutations(child, (*path, key), width):
+            yield sub_path, _replace(node, key, changed)
+
+
+def _replace(node, key, value):
+    node = copy.copy(node)
+    node[key] = value
+    return node
+
+
+def errors(validator, instance):
+    return sorted(
+        (tuple(e.path), e.message, e.validator) for e in validator.iter_errors(instance)
+    )
+
+
+class CompiledParityTest(unittest.TestCase):
+    """The compiled module reports exactly what jsonschema Draft7 reports."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.interpreted = build_validators(load_schema(SCHEMA_PATH))
+        with tempfile.TemporaryDirectory() as cache_dir:
+            module = load_compiled(SCHEMA_PATH, load_schema, cache_dir)
+        cls.compiled = (
+            module.root,
+            module.definitions["globalEntry"],
+            module.definitions["typeEntry"],
+        )
+        cls.documents = [(fp, load_yaml(fp)) for fp in collect([SOURCE_ROOT])]
+
+    def assertSameErrors(self, index, instance, label):
+        expected = errors(self.interpreted[index], instance)
+        got = errors(self.compiled[index], instance)
+        self.assertEqual(got, expected, label)
+        self.assertEqual(self.compiled[index].is_valid(instance), not expected, label)
+
+    def test_source_files(self):
+        self.assertTrue(self.documents)
+        for fp, data in self.documents:
+            self.assertSameErrors(0, data, fp)
+
+    def test_mutated_roots(self):
+        for instance in (None, [], "globals", {}, {"globals": {}}, {"types": {}}):
+            self.assertSameErrors(0, instance, repr(instance))
+        _, data = min(self.documents, key=lambda doc: len(repr(doc[1])))
+        for path, instance in mutations(data, width=2):
+            self.assertSameErrors(0, instance, path)
+
+    def test_mutated_entries(self):
+        # The first entry of each section per file keeps the run short while
+        # still covering every definition the tree uses
+        checked = 0
+        for fp, data in self.documents:
+            for index, section in ((1, "globals"), (2, "types")):
+                entries = data.get(section) or {}
+                for name, entry in list(entries.items())[:1]:
+                    for path, instance in mutations(entry):
+                        self.assertSameErrors(index, instance, (fp, name, *path))
+                        checked += 1
+        self.assertGreater(checked, 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from schema_diff import diff_schemas
+
+SCHEMA = {
+    "globals": {
+        "coord": {
+            "kind": "singleton",
+            "static": {
+                "MGRStoLL": {
+                    "type": "function",
+                    "params": [{"name": "mgrs", "type": "MGRS"}],
+                }
+            },
+        }
+    },
+    "types": {"unknown": {"kind": "union", "anyOf": ["string", "number"]}},
+}
+
+
+class OneSidedChildrenTest(unittest.TestCase):
+    """Entries without children are hashed as leaves on one side only."""
+
+    def test_first_child_added(self):
+        new = copy.deepcopy(SCHEMA)
+        new["types"]["unknown"]["fields"] = {"first": {"type": "string"}}
+        self.assertEqual(
+            diff_schemas(SCHEMA, new),
+            [
+                {
+                    "change": "added",
+                    "kind": "field",
+                    "path": ["types", "unknown", "fields.first"],
+                }
+            ],
+        )
+
+    def test_last_child_removed(self):
+        new = copy.deepcopy(SCHEMA)
+        new["globals"]["coord"]["static"]["MGRStoLL"]["params"] = []
+        member = ["globals", "coord", "static.MGRStoLL"]
+        self.assertEqual(
+            diff_schemas(SCHEMA, new),
+            [
+                {
+                    "change": "changed",
+                    "kind": "member",
+                    "path": member,
+                    "keys": ["params"],
+                },
+                {
+                    "change": "removed",
+                    "kind": "param",
+                    "path": [*member, "params.mgrs"],
+                },
+            ],
+        )
+
+    def test_own_fields_and_children_on_one_side(self):
+        new = copy.deepcopy(SCHEMA)
+        new["types"]["unknown"]["description"] = "Any value"
+        new["types"]["unknown"]["values"] = {"A": 1}
+        changes = diff_schemas(new, SCHEMA)
+        self.assertEqual(
+            [(c["change"], c["path"][-1], c.get("keys")) for c in changes],
+            [("changed", "unknown", ["description"]), ("removed", "values.A", None)],
+        )
+
+
+class ParamKeysTest(unittest.TestCase):
+    """Every param is a separate child, whatever its name."""
+
+    def test_unnamed_param_does_not_shadow_a_param_named_like_its_index(self):
+        old = copy.deepcopy(SCHEMA)
+        member = old["globals"]["coord"]["static"]["MGRStoLL"]
+        member["params"] = [{"name": "1", "type": "string"}, {"type": "number"}]
+        for changed in (0, 1):
+            new = copy.deepcopy(old)
+            new["globals"]["coord"]["static"]["MGRStoLL"]["params"][changed]["type"] = (
+                "boolean"
+            )
+            self.assertEqual(
+                [(c["kind"], c["path"][-1]) for c in diff_schemas(old, new)],
+                [("param", ["params.1", "params#1"][changed])],
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from collections import Counter
+from contextlib import redirect_stdout
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from validate import (
+    build_validators,
+    check_file,
+    classify,
+    load_schema,
+    result_cache_key,
+    validate_paths,
+)
+
+ROOT = Path(__file__).resolve().parent.parent
+SCHEMA_PATH = ROOT / "dcs_yaml_schema.yaml"
+
+
+class ClassifyTest(unittest.TestCase):
+    """Bare entries are routed by kind and by keys only one definition accepts."""
+
+    def test_string_kind(self):
+        self.assertEqual(classify({"kind": "class"}), "globals")
+        self.assertEqual(classify({"kind": "union"}), "types")
+
+    def test_non_string_kind_falls_through_to_keys(self):
+        self.assertEqual(classify({"kind": ["class"]}), "globals")
+        self.assertEqual(classify({"kind": {"a": 1}, "fields": {}}), "types")
+
+    def test_non_string_kind_is_a_schema_error(self):
+        validators = build_validators(load_schema(SCHEMA_PATH))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "entry.yaml"
+            path.write_text("kind: [class]\n", encoding="utf-8")
+            ok, lines, _, digest = check_file(path, validators)
+        self.assertFalse(ok)
+        self.assertGreater(len(lines), 1)
+        self.assertIsNotNone(digest)
+
+
+class ResultCacheTest(unittest.TestCase):
+    """Cached reports are replayed only for unchanged files and schema."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.schema = self.tmp / "dcs_yaml_schema.yaml"
+        shutil.copyfile(SCHEMA_PATH, self.schema)
+        self.cache_path = self.tmp / "results.json"
+        self.good = self.tmp / "good.yaml"
+        self.good.write_text("globals: {}\ntypes: {}\n", encoding="utf-8")
+        self.bad = self.tmp / "bad.yaml"
+        self.bad.write_text("globals:\n  Broken: {kind: nope}\n", encoding="utf-8")
+
+    def run_cached(self):
+        stats, out = Counter(), io.StringIO()
+        with redirect_stdout(out):
+            ok = validate_paths(
+                [self.good, self.bad],
+                self.schema,
+                compiled=False,
+                stats=stats,
+                cache_path=self.cache_path,
+            )
+        return ok, out.getvalue(), stats["cached"]
+
+    def test_unchanged_files_are_replayed(self):
+        first = self.run_cached()
+        self.assertEqual(first[2], 0)
+        self.assertTrue(self.cache_path.is_file())
+        second = self.run_cached()
+        self.assertEqual(second, (first[0], first[1], 2))
+        self.assertFalse(second[0])
+
+    def test_changed_file_is_revalidated(self):
+        self.run_cached()
+        self.bad.write_text("globals: {}\ntypes: {}\n", encoding="utf-8")
+        ok, _, cached = self.run_cached()
+        self.assertTrue(ok)
+        self.assertEqual(cached, 1)
+        self.assertEqual(self.run_cached()[2], 2)
+
+    def test_changed_schema_revalidates_all(self):
+        self.run_cached()
+        with open(self.schema, "a", encoding="utf-8") as f:
+            f.write("# changed\n")
+        self.assertEqual(self.run_cached()[2], 0)
+        self.assertEqual(self.run_cached()[2], 2)
+
+    def test_key_depends_on_schema_and_validator(self):
+        key = result_cache_key(self.schema, compiled=False)
+        self.assertEqual(key, result_cache_key(self.schema, compiled=False))
+        self.assertNotEqual(key, result_cache_key(self.schema, compiled=True))
+        with open(self.schema, "a", encoding="utf-8") as f:
+            f.write("# changed\n")
+        self.assertNotEqual(key, result_cache_key(self.schema, compiled=False))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from merge import merge_schema
+from provenance import new_provenance
+from validate_types import collect_ignored_types
+
+ROOT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "dcs-world-schema"
+)
+
+
+def ignored_both_ways(root):
+    provenance = new_provenance(root)
+    merge_schema(root, provenance=provenance)
+    return collect_ignored_types(root), collect_ignored_types(root, provenance)
+
+
+class IgnoredTypesTest(unittest.TestCase):
+    """The provenance index gives the same ignored types as reading the sources."""
+
+    def test_real_tree(self):
+        from_sources, from_provenance = ignored_both_ways(ROOT)
+        self.assertTrue(from_sources)
+        self.assertEqual(from_provenance, from_sources)
+
+    def test_type_extended_in_an_ignored_directory(self):
+        files = {
+            "types/common.yaml": "types:\n  Shared:\n    fields: {a: {type: string}}\n",
+            "types/tasks/extra.yaml": "types:\n  Shared:\n    fields: {b: {type: number}}\n",
+        }
+        with tempfile.TemporaryDirectory() as root:
+            for rel, text in files.items():
+                os.makedirs(os.path.dirname(os.path.join(root, rel)), exist_ok=True)
+                with open(os.path.join(root, rel), "w", encoding="utf-8") as f:
+                    f.write(text)
+            from_sources, from_provenance = ignored_both_ways(root)
+        self.assertEqual(from_sources, {"Shared"})
+        self.assertEqual(from_provenance, {"Shared"})
+
+
+if __name__ == "__main__":
+    unittest.main()
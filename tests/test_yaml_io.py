@@ -0,0 +1,109 @@
+import glob
+import os
+import sys
+import unittest
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "tools"))
+
+from yaml_io import safe_load_with_locations
+
+ROOT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "dcs-world-schema"
+)
+
+LOADERS = [yaml.SafeLoader]
+if getattr(yaml, "__with_libyaml__", False):
+    LOADERS.append(yaml.CSafeLoader)
+
+DOCUMENTS = {
+    "anchors and aliases": "a: &A {x: 1, y: [1, 2]}\nb: *A\nc: [*A, *A]\n",
+    "scalar anchors": "a: &n 3\nb: *n\n&k key: 1\nother: *k\n",
+    "merge": "base: &B {a: 1, b: 2}\nm:\n  <<: *B\n  b: 3\n",
+    "merge list": (
+        "b: &B {a: 1, b: 2}\no: &O {b: 3, c: 4}\nm:\n  <<: [*B, *O]\n  a: 9\n"
+    ),
+    "nested merge": "o:\n  <<:\n    <<: {deep: {x: 1}}\n    mid: 2\n  top: 3\n",
+    "merge of an alias with merges": (
+        "b: &B {p: {q: 1}}\nm: &M\n  <<: *B\n  r: 2\nn:\n  <<: *M\n  s: 3\n"
+    ),
+    "set": "s: !!set {a, b}\nt: !!set\n  ? c\n",
+    "omap and pairs": "o: !!omap [a: 1, b: {c: [2]}]\np: !!pairs [a: 1, a: 2]\n",
+    "aliases across tagged collections": (
+        "v: &v 3\ns: !!set {*v}\no: !!omap [k: &z [1, 2]]\nq: *z\n"
+    ),
+    "explicit default tags": "m: !!map {a: 1}\nq: !!seq [1]\ns: !!str 12\n",
+    "scalars": "a: yes\nb: 0o17\nc: 2001-12-14\nd: .inf\ne: ~\nf: !!binary aGk=\n",
+    "empty": "",
+}
+
+ERRORS = {
+    "redefined anchor": "a: &x {b: 1}\nc: &x 2\n",
+    "redefined anchor in a set": "a: &x 1\nb: !!set {&x k}\n",
+    "undefined alias": "a: *nope\n",
+    "scalar merge": "<<: 5\n",
+    "unknown tag": "x: !foo {a: 1}\n",
+    "unhashable set member": "s: !!set {[1]}\n",
+    "two documents": "a: 1\n---\nb: 2\n",
+}
+
+
+class SafeLoadParityTest(unittest.TestCase):
+    """safe_load_with_locations builds what yaml.safe_load builds."""
+
+    def assert_same_data(self, text):
+        for loader in LOADERS:
+            with self.subTest(loader=loader.__name__):
+                data, _ = safe_load_with_locations(text, loader)
+                self.assertEqual(data, yaml.load(text, Loader=loader))
+
+    def test_documents(self):
+        for name, text in DOCUMENTS.items():
+            with self.subTest(name):
+                self.assert_same_data(text)
+
+    def test_errors(self):
+        for name, text in ERRORS.items():
+            for loader in LOADERS:
+                with self.subTest(name, loader=loader.__name__):
+                    with self.assertRaises(yaml.YAMLError) as expected:
+                        yaml.load(text, Loader=loader)
+                    with self.assertRaises(type(expected.exception)):
+                        safe_load_with_locations(text, loader)
+
+    def test_schema_tree(self):
+        for path in sorted(
+            glob.glob(os.path.join(ROOT, "**", "*.yaml"), recursive=True)
+        ):
+            with open(path, encoding="utf-8") as f:
+                text = f.read()
+            with self.subTest(path=os.path.relpath(path, ROOT)):
+                self.assert_same_data(text)
+
+
+class LocationsTest(unittest.TestCase):
+    """Nodes are located where they are defined, aliases where they are used."""
+
+    def test_alias_children_point_at_the_anchor(self):
+        _, locations = safe_load_with_locations(DOCUMENTS["anchors and aliases"])
+        self.assertEqual(locations[("b",)], (2, 1))
+        self.assertEqual(locations[("b", "y", 1)], locations[("a", "y", 1)])
+        self.assertEqual(locations[("c", 1, "x")], locations[("a", "x")])
+
+    def test_merged_entries_point_at_their_source(self):
+        _, locations = safe_load_with_locations(DOCUMENTS["merge list"])
+        self.assertEqual(locations[("m", "a")], (5, 3))
+        self.assertEqual(locations[("m", "b")], locations[("b", "b")])
+        self.assertEqual(locations[("m", "c")], locations[("o", "c")])
+        self.assertFalse(any(len(p) > 2 for p in locations if p[0] == "m"))
+
+    def test_nested_merges(self):
+        _, locations = safe_load_with_locations(DOCUMENTS["nested merge"])
+        self.assertEqual(locations[("o", "deep", "x")], (3, 17))
+        self.assertEqual(locations[("o", "mid")], (4, 5))
+        self.assertEqual(len(locations), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
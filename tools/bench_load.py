@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Measure how long tools take to load the merged schema in each available form.
+Usage: python bench_load.py [<schema.json>] [--repeat N]
+
+Run `task merge` first so the snapshot, interned copy and byte-offset index
+sidecars exist. Also reports the memory held by the loaded schema.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+from bench_yaml import best_of
+from interned import expand
+from merge import interned_path
+from schema_io import IndexedSchema, index_path, load_entry
+from snapshot import read_snapshot, snapshot_path
+
+
+def load_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def retained(fn):
+    """Bytes still allocated by the object fn returns, once it returns."""
+    tracemalloc.start()
+    try:
+        result = fn()  # noqa: F841 - kept alive until measured
+        gc.collect()  # drop any temporaries caught in reference cycles
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark merged schema loading.")
+    parser.add_argument(
+        "schema",
+        nargs="?",
+        default=os.path.join("dist", "dcs-world-api-schema.json"),
+        help="Merged schema JSON file",
+    )
+    parser.add_argument(
+        "--repeat", "-n", type=int, default=20, help="Runs per measurement"
+    )
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.schema):
+        print(f"✖ Schema file not found: {args.schema}")
+        sys.exit(1)
+
+    schema = load_json(args.schema)
+    results = [("json.load", best_of(args.repeat, lambda: load_json(args.schema)))]
+    if read_snapshot(args.schema) is not None:
+        results.append(
+            ("snapshot", best_of(args.repeat, lambda: read_snapshot(args.schema)))
+        )
+    else:
+        print(f"⚠️ No fresh snapshot at {snapshot_path(args.schema)}")
+    interned = interned_path(args.schema)
+    memory = [("json.load", retained(lambda: load_json(args.schema)))]
+    if os.path.isfile(interned):
+        results.append(
+            ("interned", best_of(args.repeat, lambda: expand(load_json(interned))))
+        )
+        results.append(
+            (
+                "interned shared",
+                best_of(args.repeat, lambda: expand(load_json(interned), shared=True)),
+            )
+        )
+        memory.append(("interned", retained(lambda: expand(load_json(interned)))))
+        memory.append(
+            (
+                "interned shared",
+                retained(lambda: expand(load_json(interned), shared=True)),
+            )
+        )
+    else:
+        print(f"⚠️ No interned copy at {interned}")
+    if os.path.isfile(index_path(args.schema)) and schema.get("types"):
+        name = next(iter(schema["types"]))
+
+        def lazy_lookup():
+            with IndexedSchema(args.schema) as indexed:
+                return indexed["types"][name]
+
+        results.append(
+            (
+                "index: 1 entry",
+                best_of(args.repeat, lambda: load_entry(args.schema, "types", name)),
+            )
+        )
+        results.append(("mmap: 1 entry", best_of(args.repeat, lazy_lookup)))
+    else:
+        print(f"⚠️ No byte-offset index at {index_path(args.schema)}")
+
+    size = os.path.getsize(args.schema) / 1024
+    print(f"{args.schema}: {size:.0f} KiB")
+    if os.path.isfile(interned):
+        print(f"{interned}: {os.path.getsize(interned) / 1024:.0f} KiB")
+    print("Load time:")
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"{name:>16}: {seconds * 1000:8.2f} ms  ({baseline / seconds:5.1f}x)")
+    print("Memory held by the loaded schema:")
+    for name, size in memory:
+        print(f"{name:>16}: {size / 1024:8.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Compare the jsonschema validators with the module compiled from the schema.
+Usage: python bench_validate.py [--root <dir>] [--schema <dcs_yaml_schema.yaml>] [--repeat N]
+
+Source files are parsed once up front, so only validator setup and validation
+are timed. The report of every file must be identical for both validators.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+from bench_yaml import best_of
+from schema_compiler import load_compiled
+from validate import (
+    DEFAULT_SCHEMA_FILENAME,
+    build_validators,
+    collect,
+    load_schema,
+    load_yaml,
+    validate_file,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark interpreted and compiled source validation."
+    )
+    parser.add_argument(
+        "--root", "-r", default="dcs-world-schema", help="Schema source directory"
+    )
+    parser.add_argument(
+        "--schema", default=DEFAULT_SCHEMA_FILENAME, help="dcs_yaml_schema.yaml"
+    )
+    parser.add_argument(
+        "--repeat", "-n", type=int, default=5, help="Runs per measurement"
+    )
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.schema):
+        print(f"✖ Schema not found: {args.schema}")
+        sys.exit(1)
+    files = [(fp, load_yaml(fp)) for fp in collect([args.root])]
+    if not files:
+        print("✖ No YAML files found")
+        sys.exit(1)
+
+    def compiled(cache_dir):
+        module = load_compiled(args.schema, load_schema, cache_dir)
+        return (
+            module.root,
+            module.definitions["globalEntry"],
+            module.definitions["typeEntry"],
+        )
+
+    def validate_all(validators):
+        return [validate_file(fp, data, *validators) for fp, data in files]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        setup = [
+            (
+                "jsonschema",
+                best_of(
+                    args.repeat, lambda: build_validators(load_schema(args.schema))
+                ),
+            ),
+            ("compile", best_of(1, lambda: compiled(cache_dir))),
+            ("compiled (cached)", best_of(args.repeat, lambda: compiled(cache_dir))),
+        ]
+        interpreted, generated = (
+            build_validators(load_schema(args.schema)),
+            compiled(cache_dir),
+        )
+
+    if validate_all(interpreted) != validate_all(generated):
+        print("✖ Compiled validators report different errors than jsonschema")
+        sys.exit(1)
+    runs = [
+        ("jsonschema", best_of(args.repeat, lambda: validate_all(interpreted))),
+        ("compiled", best_of(args.repeat, lambda: validate_all(generated))),
+    ]
+
+    print(f"{len(files)} file(s) under {args.root}, identical reports")
+    print("Validator setup:")
+    for name, seconds in setup:
+        print(f"{name:>18}: {seconds * 1000:8.2f} ms")
+    print("Validation:")
+    baseline = runs[0][1]
+    for name, seconds in runs:
+        print(f"{name:>18}: {seconds * 1000:8.2f} ms  ({baseline / seconds:5.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
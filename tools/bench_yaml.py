@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark the pure-Python and LibYAML PyYAML backends on the real schema tree.
+Usage: python bench_yaml.py [--root <dir>] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import yaml
+from merge import deep_merge, find_yaml_files
+
+BACKENDS = [("pure-python", yaml.SafeLoader, yaml.SafeDumper)]
+if getattr(yaml, "__with_libyaml__", False):
+    BACKENDS.append(("libyaml", yaml.CSafeLoader, yaml.CSafeDumper))
+
+
+def best_of(repeat, fn):
+    """Return the fastest wall time of ``repeat`` runs of fn, in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YAML backends.")
+    parser.add_argument(
+        "--root", "-r", default="dcs-world-schema", help="Schema root directory"
+    )
+    parser.add_argument(
+        "--repeat", "-n", type=int, default=5, help="Runs per measurement"
+    )
+    args = parser.parse_args()
+
+    abs_root = os.path.abspath(args.root)
+    if not os.path.isdir(abs_root):
+        print(f"✖ Root directory not found: {abs_root}")
+        sys.exit(1)
+
+    texts = []
+    for filepath in find_yaml_files([abs_root], abs_root):
+        with open(filepath, "r", encoding="utf-8") as f:
+            texts.append(f.read())
+    merged = {}
+    for text in texts:
+        data = yaml.load(text, Loader=BACKENDS[0][1])
+        if data:
+            deep_merge(data, merged)
+
+    print(f"{len(texts)} file(s), {sum(map(len, texts)) / 1024:.0f} KiB of YAML")
+    results = {}
+    for name, loader, dumper in BACKENDS:
+        load_s = best_of(
+            args.repeat,
+            lambda loader=loader: [yaml.load(t, Loader=loader) for t in texts],
+        )
+        dump_s = best_of(
+            args.repeat,
+            lambda dumper=dumper: yaml.dump(
+                merged, Dumper=dumper, allow_unicode=True, sort_keys=False, indent=2
+            ),
+        )
+        results[name] = (load_s, dump_s)
+        print(
+            f"{name:>12}: load {load_s * 1000:8.1f} ms   dump {dump_s * 1000:8.1f} ms"
+        )
+
+    if "libyaml" in results:
+        (pl, pd), (cl, cd) = results["pure-python"], results["libyaml"]
+        print(f"{'speedup':>12}: load {pl / cl:8.1f}x    dump {pd / cd:8.1f}x")
+    else:
+        print("⚠️ PyYAML was built without LibYAML; only the pure-Python backend ran.")
+
+
+if __name__ == "__main__":
+    main()
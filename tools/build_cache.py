@@ -0,0 +1,182 @@
+"""
+Content-addressed build cache helpers shared by merge.py, the exporters and pipeline.py.
+
+Build steps are keyed by a digest of everything that can change their result:
+the merged schema, the source of the tool that runs them and their options.
+Outputs are only rewritten when their content changes, so file watchers such
+as LuaLS or tsc do not re-index identical artifacts.
+"""
+
+import hashlib
+import json
+import os
+
+# Bump whenever the cache layout changes so stale caches are discarded.
+BUILD_CACHE_VERSION = 1
+# Streamed outputs are written and compared in chunks of this size
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path):
+    """Digest of a file's content, or None if it does not exist."""
+    try:
+        with open(path, "rb") as f:
+            return sha256_bytes(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def schema_digest(schema):
+    """
+    Digest of a merged schema.
+
+    Key order is kept because it decides the order of generated output, so two
+    schemas that differ only in ordering get different digests.
+    """
+    text = json.dumps(schema, ensure_ascii=False, separators=(",", ":"))
+    return sha256_bytes(text.encode("utf-8"))
+
+
+def source_stamp(path):
+    """Size and mtime of the file a sidecar was derived from."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def matches_source(stamp, path):
+    """True if path still has the size and mtime recorded in stamp."""
+    try:
+        return stamp == source_stamp(path)
+    except OSError:
+        return False
+
+
+def build_key(*parts):
+    """Combine digests, names and JSON-serializable options into one cache key."""
+    text = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return sha256_bytes(text.encode("utf-8"))
+
+
+def write_text_if_changed(path, text):
+    """
+    Write text to path unless the file already holds exactly that content.
+
+    Returns True if the file was written. Identical files are left untouched so
+    their mtime is preserved. The new content is written to a temporary file
+    and then replaces path, so an interrupted run never leaves a truncated file.
+    """
+    data = text.replace("\n", os.linesep).encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return True
+
+
+def _same_content(path_a, path_b):
+    try:
+        with open(path_a, "rb") as a, open(path_b, "rb") as b:
+            if os.fstat(a.fileno()).st_size != os.fstat(b.fileno()).st_size:
+                return False
+            while True:
+                chunk = a.read(WRITE_BUFFER_SIZE)
+                if chunk != b.read(WRITE_BUFFER_SIZE):
+                    return False
+                if not chunk:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+def write_stream_if_changed(path, write, binary=False):
+    """
+    Streaming counterpart of write_text_if_changed.
+
+    write(f) serializes straight into a text file (a binary one with binary)
+    with a large write buffer, so the whole output is never held in memory.
+    The result replaces path only if its content differs. Returns True if the
+    file was written.
+    """
+    output_dir = os.path.dirname(path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        mode = {"mode": "wb"} if binary else {"mode": "w", "encoding": "utf-8"}
+        with open(tmp_path, buffering=WRITE_BUFFER_SIZE, **mode) as f:
+            write(f)
+        if _same_content(tmp_path, path):
+            return False
+        os.replace(tmp_path, path)
+        return True
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_build_cache(path):
+    """Load the build cache, returning an empty cache if unusable."""
+    empty = {"version": BUILD_CACHE_VERSION, "steps": {}}
+    if not path or not os.path.isfile(path):
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if not isinstance(cache, dict) or cache.get("version") != BUILD_CACHE_VERSION:
+        return empty
+    return cache
+
+
+def save_build_cache(path, cache):
+    """Atomically write the build cache."""
+    cache_dir = os.path.dirname(path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def lookup(cache, step, key):
+    """
+    Return the cached entry for step if its key matches and outputs are intact.
+
+    An entry records the digest of every output it produced; a missing or
+    edited output file invalidates it.
+    """
+    entry = cache["steps"].get(step)
+    if not entry or entry.get("key") != key:
+        return None
+    for path, digest in entry.get("outputs", {}).items():
+        if sha256_file(path) != digest:
+            return None
+    return entry
+
+
+def store(cache, step, key, outputs, log=""):
+    """Record a successful step with the digests of the outputs it produced."""
+    cache["steps"][step] = {
+        "key": key,
+        "outputs": {path: sha256_file(path) for path in outputs},
+        "log": log,
+    }
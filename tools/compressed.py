@@ -0,0 +1,113 @@
+"""
+Compressed variants of the build artifacts.
+
+merge.py, the exporters and pipeline.py can write ``<output>.gz`` and
+``<output>.xz``, plus ``<output>.zst`` when the optional ``zstandard`` package
+is installed, next to each output with ``--compress``. Variants are only
+rewritten when their content changes and contain no timestamps, so equal
+outputs always compress to identical files.
+
+The schema loaders open their inputs with ``open_text``, which decompresses
+``.gz``, ``.xz`` and ``.zst`` files as they are read, so the tools accept
+compressed artifacts without a separate decompress step.
+"""
+
+import gzip
+import io
+import lzma
+import os
+import shutil
+
+from build_cache import WRITE_BUFFER_SIZE, write_stream_if_changed
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ZSTD_SUFFIX = "zst"
+
+
+def _gzip_writer(f):
+    # No file name and a zero mtime in the header keep the output reproducible
+    return gzip.GzipFile(filename="", mode="wb", fileobj=f, mtime=0)
+
+
+def _zstd_writer(f):
+    return zstandard.ZstdCompressor(level=19).stream_writer(f, closefd=False)
+
+
+def _zstd_reader(path):
+    if zstandard is None:
+        raise ValueError(f"reading {path} requires the zstandard package")
+    return zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+
+
+# Suffix -> (writer wrapping a binary file, reader opening a path in binary mode);
+# readers return open streams that the caller closes
+CODECS = {
+    "gz": (_gzip_writer, lambda path: gzip.open(path, "rb")),  # noqa: SIM115
+    "xz": (
+        lambda f: lzma.LZMAFile(f, "wb"),  # noqa: SIM115
+        lambda path: lzma.open(path, "rb"),  # noqa: SIM115
+    ),
+}
+if zstandard is not None:
+    CODECS[ZSTD_SUFFIX] = (_zstd_writer, _zstd_reader)
+
+
+def codec_of(path):
+    """Compression suffix of path (``gz``, ``xz``, ``zst``), or None."""
+    suffix = os.path.splitext(os.fspath(path))[1][1:].lower()
+    return suffix if suffix in CODECS or suffix == ZSTD_SUFFIX else None
+
+
+def strip_codec(path):
+    """Path without its compression suffix: ``schema.json.gz`` -> ``schema.json``."""
+    path = os.fspath(path)
+    return os.path.splitext(path)[0] if codec_of(path) else path
+
+
+def open_text(path):
+    """Open a possibly compressed UTF-8 file for streaming reads."""
+    codec = codec_of(path)
+    if codec is None:
+        return open(path, "r", encoding="utf-8")
+    if codec == ZSTD_SUFFIX:
+        raw = _zstd_reader(path)
+    else:
+        raw = CODECS[codec][1](path)
+    return io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def compress_file(path, codec):
+    """
+    Write the ``<path>.<codec>`` variant of a file.
+
+    Returns ``(compressed_path, written)``; written is False if the variant
+    already held exactly this content.
+    """
+    target = f"{path}.{codec}"
+
+    def write(f):
+        with open(path, "rb") as source, CODECS[codec][0](f) as out:
+            shutil.copyfileobj(source, out, WRITE_BUFFER_SIZE)
+
+    return target, write_stream_if_changed(target, write, binary=True)
+
+
+def compress_outputs(paths, codecs):
+    """Compress every path with every codec; returns the compressed paths."""
+    return [compress_file(path, codec)[0] for path in paths for codec in codecs]
+
+
+def add_compress_argument(parser):
+    """Add the shared ``--compress CODEC...`` option to a tool's argument parser."""
+    parser.add_argument(
+        "--compress",
+        nargs="+",
+        choices=list(CODECS),
+        default=[],
+        metavar="CODEC",
+        help=f"Also write compressed copies of the output ({', '.join(CODECS)})",
+    )
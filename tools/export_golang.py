@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import os
 import sys
 import re
 from typing import Any, Dict, List, Optional, Set
 
+from build_cache import write_text_if_changed
+from compressed import add_compress_argument, compress_outputs
+from snapshot import load_schema as load_merged_schema
+
 # Go type mapping
 TYPE_MAPPING = {
     "number": "float64",
@@ -24,9 +27,8 @@ namespace_declarations: Dict[str, List[str]] = {}
 
 
 def load_schema(path: str) -> Dict[str, Any]:
-    """Load the schema from a JSON file"""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load the schema from a JSON file, using its snapshot when it is fresh"""
+    return load_merged_schema(path)
 
 
 def sanitize_go_name(name: str) -> str:
@@ -372,9 +374,8 @@ def export_to_golang(
     # Generate Go code
     go_code = generate_go_package(schema, package_name)
 
-    # Write to file
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(go_code)
+    # Write to file, leaving an identical file untouched
+    write_text_if_changed(output_path, go_code)
 
     print(f"Go code exported to {output_path}")
 
@@ -391,12 +392,15 @@ def main():
     parser.add_argument(
         "--package", "-p", default="dcsapi", help="Go package name (default: dcsapi)"
     )
+    add_compress_argument(parser)
 
     args = parser.parse_args()
 
     try:
         schema = load_schema(args.schema)
         export_to_golang(schema, args.output, args.package)
+        for path in compress_outputs([args.output], args.compress):
+            print(f"Compressed copy written to {path}")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,12 +1,15 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import os
 import sys
 from typing import Any, Dict, List, Set, Union, Tuple
 import datetime
 from collections import deque
 
+from build_cache import write_text_if_changed
+from compressed import add_compress_argument, compress_outputs
+from snapshot import load_schema as load_merged_schema
+
 # LUA primitive type mapping
 TYPE_MAPPING = {
     "number": "number",
@@ -29,7 +32,7 @@ initialized_lua_tables: Set[str] = set()
 
 def load_schema(path: str) -> Dict[str, Any]:
     """
-    Load the schema from a JSON file.
+    Load the schema from a JSON file, using its snapshot when it is fresh.
 
     :param path: Path to the JSON schema file.
     :type path: str
@@ -38,8 +41,7 @@ def load_schema(path: str) -> Dict[str, Any]:
     :returns: The loaded schema as a dictionary.
     :rtype: Dict[str, Any]
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_merged_schema(path)
 
 
 def sanitize_lua_name(name: str) -> str:
@@ -1175,15 +1177,20 @@ def topological_sort(graph_adj: Dict[str, Set[str]]) -> List[str]:
         return sorted_order + remaining_nodes
 
 
-def export_to_lua(schema: Dict[str, Any], output_path: str) -> None:
+def export_to_lua(
+    schema: Dict[str, Any], output_path: str, reproducible: bool = False
+) -> None:
     """
     Exports the given DCS schema to an EmmyLua annotation file,
     processing types in a topologically sorted order to ensure dependencies are met.
+    The file is only rewritten when its content changes.
 
     :param schema: The loaded DCS API schema.
     :type schema: Dict[str, Any]
     :param output_path: The path where the .lua file will be saved.
     :type output_path: str
+    :param reproducible: Omit the generation timestamp so identical schemas produce identical files.
+    :type reproducible: bool
     """
     output_dir = os.path.dirname(output_path)
     if output_dir:
@@ -1197,12 +1204,10 @@ def export_to_lua(schema: Dict[str, Any], output_path: str) -> None:
         "--[[ DCS World Lua Type Definitions",
         f"Generated from schema: {source_file_name}",
         "DO NOT MODIFY - AUTO-GENERATED FILE",
-        f"Generated on: {datetime.datetime.now().isoformat()}",
-        "--]]",
-        "",
-        "---@meta",
-        "",
     ]
+    if not reproducible:
+        header_info.append(f"Generated on: {datetime.datetime.now().isoformat()}")
+    header_info += ["--]]", "", "---@meta", ""]
     output_content_parts = []
     processed_types.clear()
     initialized_lua_tables.clear()
@@ -1263,8 +1268,7 @@ def export_to_lua(schema: Dict[str, Any], output_path: str) -> None:
     if not full_output_content.endswith("\n"):
         full_output_content += "\n"
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(full_output_content)
+    write_text_if_changed(output_path, full_output_content)
     print(f"Lua type definitions exported to {output_path}")
 
 
@@ -1282,12 +1286,20 @@ def main():
         default="dist/dcs-world-api.lua",
         help="Output Lua definition file",
     )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="Omit the generation timestamp so unchanged schemas give identical output",
+    )
+    add_compress_argument(parser)
     args = parser.parse_args()
 
     try:
         schema_data = load_schema(args.schema_file)
         schema_data["source_file_path"] = args.schema_file
-        export_to_lua(schema_data, args.output)
+        export_to_lua(schema_data, args.output, args.reproducible)
+        for path in compress_outputs([args.output], args.compress):
+            print(f"Compressed copy written to {path}")
     except Exception as e:
         print(f"Error processing schema {args.schema_file}: {e}", file=sys.stderr)
         import traceback
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import os
 import re
 import sys
 from typing import Any, Dict, List, Set
 
+from build_cache import write_text_if_changed
+from compressed import add_compress_argument, compress_outputs
+from snapshot import load_schema as load_merged_schema
+
 
 # Python type mapping
 TYPE_MAPPING = {
@@ -64,9 +67,8 @@ processed_types: Set[str] = set()
 
 
 def load_schema(path: str) -> Dict[str, Any]:
-    """Load the schema from a JSON file"""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load the schema from a JSON file, using its snapshot when it is fresh"""
+    return load_merged_schema(path)
 
 
 def sanitize_python_name(name: str) -> str:
@@ -468,6 +470,9 @@ def export_to_python(schema: Dict[str, Any], output_path: str) -> None:
     output_dir = os.path.dirname(output_path)
     os.makedirs(output_dir, exist_ok=True)
 
+    # Reset global state
+    processed_types.clear()
+
     lines = [
         "#!/usr/bin/env python3",
         "# DCS World API Python Type Definitions",
@@ -638,13 +643,8 @@ def export_to_python(schema: Dict[str, Any], output_path: str) -> None:
         else:
             final_lines.append(line)
 
-    # Write to file
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(final_lines))
-
     # Additional post-processing to catch any remaining problematic lines
-    with open(output_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    content = "\n".join(final_lines)
 
     # Use regex to find and fix any standalone Note: lines
     # This handles both 'Note:' at the beginning of a line and as its own statement
@@ -660,9 +660,8 @@ def export_to_python(schema: Dict[str, Any], output_path: str) -> None:
     # One more check: look for standalone backticks which cause syntax errors
     fixed_content = re.sub(r"`([^`]+)`", r"'\1'", fixed_content)
 
-    # Write the fixed content back to the file
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(fixed_content)
+    # Write to file, leaving an identical file untouched
+    write_text_if_changed(output_path, fixed_content)
 
     print(f"Python type definitions exported to {output_path}")
 
@@ -678,12 +677,15 @@ def main():
         default="dist/dcs_world_api.py",
         help="Output Python definition file (default: dist/dcs_world_api.py)",
     )
+    add_compress_argument(parser)
 
     args = parser.parse_args()
 
     try:
         schema = load_schema(args.schema)
         export_to_python(schema, args.output)
+        for path in compress_outputs([args.output], args.compress):
+            print(f"Compressed copy written to {path}")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -1,10 +1,12 @@
 import argparse
-import json
-import os
 from typing import Any, Dict, Iterable, List, Tuple
 
+from build_cache import write_text_if_changed
+from compressed import add_compress_argument, compress_outputs
+from snapshot import load_schema as load_merged_schema
+
 try:
-    import yaml  # type: ignore
+    from yaml_io import describe_backend, safe_dump
 except Exception as exc:  # noqa: BLE001
     raise RuntimeError(
         "PyYAML is required to export Selene YAML. Add pyyaml to dependencies."
@@ -25,8 +27,7 @@ PRIMITIVE_TYPE_MAP: Dict[str, str] = {
 
 
 def load_schema(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return load_merged_schema(path)
 
 
 def normalize_arg_type(type_string: str) -> Tuple[str, Any]:
@@ -80,7 +81,7 @@ def export_to_selene_yaml(schema: Dict[str, Any]) -> Dict[str, Any]:
 
             # If the property defines nested static functions, emit them as functions
             if isinstance(prop_def, dict):
-                nested_static = (prop_def.get("static") or {})
+                nested_static = prop_def.get("static") or {}
                 if isinstance(nested_static, dict):
                     for func_name, func_def in nested_static.items():
                         params = func_def.get("params") or []
@@ -136,6 +137,13 @@ def export_to_selene_yaml(schema: Dict[str, Any]) -> Dict[str, Any]:
     return doc
 
 
+def write_selene_yaml(schema: dict[str, Any], output_path: str) -> None:
+    data = export_to_selene_yaml(schema)
+    text = safe_dump(data, sort_keys=False, allow_unicode=True)
+    write_text_if_changed(output_path, text)
+    print(f"Selene YAML exported to {output_path}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Export DCS schema to Selene standard library (YAML)"
@@ -147,16 +155,18 @@ def main() -> None:
         default="dist/dcs-world-selene.yml",
         help="Output Selene YAML file",
     )
+    parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Report the YAML backend in use"
+    )
+    add_compress_argument(parser)
     args = parser.parse_args()
+    if args.verbose:
+        print(f"YAML backend: {describe_backend()}")
 
     schema = load_schema(args.schema)
-    data = export_to_selene_yaml(schema)
-    output_dir = os.path.dirname(args.output)
-    if output_dir:
-        os.makedirs(output_dir, exist_ok=True)
-    with open(args.output, "w", encoding="utf-8") as f:
-        yaml.safe_dump(data, f, sort_keys=False, allow_unicode=True)
-    print(f"Selene YAML exported to {args.output}")
+    write_selene_yaml(schema, args.output)
+    for path in compress_outputs([args.output], args.compress):
+        print(f"Compressed copy written to {path}")
 
 
 if __name__ == "__main__":
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 import argparse
-import json
 import os
 import sys
 import re
 from typing import Any, Dict, List, Optional, Set
 
+from build_cache import write_text_if_changed
+from compressed import add_compress_argument, compress_outputs
+from snapshot import load_schema as load_merged_schema
+
 # TypeScript primitive type mapping
 TYPE_MAPPING = {
     "number": "number",
@@ -25,9 +28,8 @@ namespace_declarations: Dict[str, List[str]] = {}
 
 
 def load_schema(path: str) -> Dict[str, Any]:
-    """Load the schema from a JSON file"""
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    """Load the schema from a JSON file, using its snapshot when it is fresh"""
+    return load_merged_schema(path)
 
 
 def sanitize_ts_name(name: str) -> str:
@@ -672,9 +674,8 @@ def export_to_typescript(schema: Dict[str, Any], output_path: str) -> None:
             output.append("}")
             output.append("")
 
-    # Write to file
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(output))
+    # Write to file, leaving an identical file untouched
+    write_text_if_changed(output_path, "\n".join(output))
 
     print(f"TypeScript definitions exported to {output_path}")
 
@@ -690,12 +691,15 @@ def main():
         default="dist/dcs-world-api.d.ts",
         help="Output TypeScript definition file (default: dist/dcs-world-api.d.ts)",
     )
+    add_compress_argument(parser)
 
     args = parser.parse_args()
 
     try:
         schema = load_schema(args.schema)
         export_to_typescript(schema, args.output)
+        for path in compress_outputs([args.output], args.compress):
+            print(f"Compressed copy written to {path}")
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,94 @@
+"""
+Interned, hash-consed encoding of the merged schema.
+
+Descriptions, type strings such as ``Object | nil`` and whole param shapes such
+as ``{name: unit, type: Unit}`` repeat many times in the merged schema. The
+interned form (``merge.py --interned``) stores every distinct string, scalar
+and subtree once in a table and refers to it by index::
+
+    {"$interned": 1, "root": 812,
+     "table": ["description", "Unit", ["n", 3], ["l", 1, 2], ["d", 0, 1], ...]}
+
+A table entry is a string, ``["n", scalar]`` for numbers, booleans and null,
+``["l", item, ...]`` for a list or ``["d", key, value, ...]`` for a mapping,
+where items, keys and values are table indexes. Children always come before
+their parents, so the table can be decoded in one forward pass.
+
+``snapshot.load_schema`` recognizes the format and expands it transparently.
+"""
+
+INTERNED_VERSION = 1
+MARKER = "$interned"
+
+
+def intern_schema(schema):
+    """Encode a JSON-normalized schema into its interned form."""
+    table, seen = [], {}
+
+    def add(key, entry):
+        index = seen.get(key)
+        if index is None:
+            index = seen[key] = len(table)
+            table.append(entry)
+        return index
+
+    def encode(value):
+        if isinstance(value, str):
+            return add(value, value)
+        if isinstance(value, dict):
+            refs = []
+            for key, item in value.items():
+                refs += (encode(key), encode(item))
+            return add(("d", *refs), ["d", *refs])
+        if isinstance(value, list):
+            refs = [encode(item) for item in value]
+            return add(("l", *refs), ["l", *refs])
+        # type() keeps True, 1 and 1.0 apart, which compare equal
+        return add(("n", type(value), value), ["n", value])
+
+    root = encode(schema)
+    return {MARKER: INTERNED_VERSION, "root": root, "table": table}
+
+
+def is_interned(document):
+    return isinstance(document, dict) and MARKER in document
+
+
+def _fresh(table, index):
+    entry = table[index]
+    if isinstance(entry, str):
+        return entry
+    tag, *refs = entry
+    if tag == "n":
+        return refs[0]
+    if tag == "l":
+        return [_fresh(table, i) for i in refs]
+    return {table[k]: _fresh(table, v) for k, v in zip(refs[::2], refs[1::2])}
+
+
+def expand(document, shared=False):
+    """
+    Decode an interned document back into the merged schema.
+
+    By default every mapping and list is a fresh object, exactly as json.load
+    would return them. With ``shared``, repeated subtrees are the same object,
+    which saves memory but must then be treated as read-only.
+    """
+    if document.get(MARKER) != INTERNED_VERSION:
+        raise ValueError(f"unsupported interned format {document.get(MARKER)!r}")
+    table = document["table"]
+    if not shared:
+        return _fresh(table, document["root"])
+
+    values = []
+    for entry in table:
+        if isinstance(entry, str):
+            values.append(entry)
+        elif entry[0] == "n":
+            values.append(entry[1])
+        elif entry[0] == "l":
+            values.append([values[i] for i in entry[1:]])
+        else:
+            refs = entry[1:]
+            values.append({values[k]: values[v] for k, v in zip(refs[::2], refs[1::2])})
+    return values[document["root"]]
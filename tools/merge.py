@@ -1,16 +1,211 @@
 #!/usr/bin/env python3
 """
 Merge YAML schema files into a single output file (JSON or YAML).
-Usage: python merge.py <output_filepath> --root <dir> [--subdirs <subdir1> <subdir2>...] [-f format] [-v]
+Usage: python merge.py [<output_filepath>] --root <dir> [--subdirs <subdir1> <subdir2>...] [-f format]
+                       [--out <format>:<path>...] [--cache <file>] [--compact] [--sort-keys]
+                       [--compress <codec>...] [--hashes] [--provenance] [--index] [--snapshot]
+                       [--interned] [--shards <dir>] [-j N] [-v]
 """
 
 import os
 import sys
-import yaml
 import json
 import argparse
-import copy
+import hashlib
+import io
+import pickle
+from collections import ChainMap
 from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from types import MappingProxyType
+
+from build_cache import source_stamp, write_stream_if_changed, write_text_if_changed
+from compressed import add_compress_argument, compress_outputs
+from interned import intern_schema
+from provenance import dumps_provenance, escape_token, new_provenance, provenance_path
+from schema_hash import dumps_hashes, hash_schema, hashes_path
+from schema_io import (
+    INDEX_VERSION,
+    INDEXED_SECTIONS,
+    index_path,
+    index_stamp,
+    write_shards,
+)
+from snapshot import snapshot_path, write_snapshot
+from yaml_io import describe_backend, safe_dump, safe_load, safe_load_with_locations
+
+# Bump whenever the cached representation changes so stale caches are discarded.
+PARSE_CACHE_VERSION = 1
+
+
+def load_parse_cache(path):
+    """Load the on-disk parse cache, returning an empty cache if unusable."""
+    empty = {"version": PARSE_CACHE_VERSION, "entries": {}}
+    if not path or not os.path.isfile(path):
+        return empty
+    try:
+        with open(path, "rb") as f:
+            cache = pickle.load(f)
+    except Exception:  # noqa: BLE001 - a damaged pickle can raise anything
+        return empty
+    if not isinstance(cache, dict) or cache.get("version") != PARSE_CACHE_VERSION:
+        return empty
+    return cache
+
+
+def save_parse_cache(path, cache):
+    """Atomically write the parse cache so concurrent merges never see a torn file."""
+    cache_dir = os.path.dirname(path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _load_yaml_bytes(filepath, raw, locations=False):
+    """
+    Parse raw YAML bytes into ``(data, error, locations)``.
+
+    Runs in worker processes, so errors are returned as text. Node locations
+    are only recorded when requested and are None otherwise.
+    """
+    try:
+        stream = io.StringIO(raw.decode("utf-8"))
+        stream.name = filepath  # keeps the file name in YAML error marks
+        if locations:
+            data, node_locations = safe_load_with_locations(stream)
+            return data, None, node_locations
+        return safe_load(stream), None, None
+    except Exception as e:
+        return None, str(e), None
+
+
+def find_yaml_files(search_paths, abs_root, ignored_files=(), verbose=False):
+    """Walk the search paths and return YAML files in merge order."""
+    found = []
+    for path in search_paths:
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                if not filename.endswith((".yaml", ".yml")):
+                    continue
+
+                filepath = os.path.join(dirpath, filename)
+                abs_path = os.path.abspath(filepath)
+
+                if not abs_path.startswith(abs_root):
+                    if verbose:
+                        print(f"Skipping file outside root: {filepath}")
+                    continue
+
+                if abs_path in ignored_files:
+                    continue
+
+                found.append(filepath)
+    return found
+
+
+def parse_files(filepaths, jobs=1, entries=None, locations=False):
+    """
+    Parse YAML files, returning ``(data, error, cache_hit, locations)`` tuples in
+    input order.
+
+    Cache entries are keyed by absolute path and hold the file's mtime, size,
+    content hash and parsed tree. A matching mtime and size is trusted outright;
+    otherwise the content hash decides whether the cached tree can be reused.
+    Cache hits are resolved in this process and only dirty files are handed to
+    a pool of ``jobs`` worker processes, so the result order never depends on
+    which worker finishes first. With ``locations``, node locations are
+    recorded too (see ``yaml_io.safe_load_with_locations``) and cached entries
+    without them are re-parsed.
+    """
+    results = [None] * len(filepaths)
+    dirty = []
+    for i, filepath in enumerate(filepaths):
+        abs_path = os.path.abspath(filepath)
+        try:
+            st = os.stat(abs_path)
+            entry = entries.get(abs_path) if entries is not None else None
+            if entry and locations and "locations" not in entry:
+                entry = None
+            if (
+                entry
+                and entry["mtime_ns"] == st.st_mtime_ns
+                and entry["size"] == st.st_size
+            ):
+                results[i] = (entry["data"], None, True, entry.get("locations"))
+                continue
+
+            with open(abs_path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            results[i] = (None, str(e), False, None)
+            continue
+
+        digest = hashlib.sha256(raw).hexdigest() if entries is not None else None
+        if entry and entry["sha256"] == digest:
+            entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+            results[i] = (entry["data"], None, True, entry.get("locations"))
+            continue
+        dirty.append((i, abs_path, st, digest, raw))
+
+    names = [filepaths[i] for i, *_ in dirty]
+    raws = [raw for *_, raw in dirty]
+    if jobs > 1 and len(raws) > 1:
+        chunksize = max(1, len(raws) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(
+                pool.map(
+                    _load_yaml_bytes,
+                    names,
+                    raws,
+                    repeat(locations),
+                    chunksize=chunksize,
+                )
+            )
+    else:
+        parsed = [_load_yaml_bytes(n, raw, locations) for n, raw in zip(names, raws)]
+
+    for (i, abs_path, st, digest, _), (data, error, node_locations) in zip(
+        dirty, parsed
+    ):
+        results[i] = (data, error, False, node_locations)
+        if entries is not None and error is None:
+            entries[abs_path] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "sha256": digest,
+                "data": data,
+            }
+            if node_locations is not None:
+                entries[abs_path]["locations"] = node_locations
+    return results
+
+
+# Lists up to this combined length are de-duplicated with a plain scan, which
+# beats hashing nested items until the quadratic term starts to dominate.
+SMALL_LIST_MERGE = 8
+
+
+def canonical_key(value):
+    """
+    Return a hashable stand-in for a parsed YAML value.
+
+    Two values get equal keys exactly when they compare equal with ``==``, so
+    dicts and lists can be de-duplicated through a set instead of a linear scan.
+    Raises TypeError for values that still cannot be hashed.
+    """
+    if isinstance(value, Mapping):
+        return (Mapping, frozenset((k, canonical_key(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return (list, tuple(canonical_key(v) for v in value))
+    if isinstance(value, set):
+        # !!set values; a frozenset compares equal to the set it was made from
+        return frozenset(value)
+    hash(value)
+    return value
 
 
 def deep_merge(source, destination):
@@ -22,79 +217,611 @@ def deep_merge(source, destination):
         elif isinstance(value, list):
             if key not in destination or not isinstance(destination[key], list):
                 destination[key] = []
-            destination[key].extend(
-                item for item in value if item not in destination[key]
-            )
+            target = destination[key]
+            if len(target) + len(value) <= SMALL_LIST_MERGE:
+                target.extend(item for item in value if item not in target)
+                continue
+            # Append unseen items in order, using a hash index instead of `in`
+            index = set()
+            for item in target:
+                try:
+                    index.add(canonical_key(item))
+                except TypeError:
+                    pass
+            for item in value:
+                try:
+                    item_key = canonical_key(item)
+                except TypeError:
+                    # Still unhashable: fall back to the linear scan
+                    if item not in target:
+                        target.append(item)
+                    continue
+                if item_key not in index:
+                    index.add(item_key)
+                    target.append(item)
         else:
             destination[key] = value
     return destination
 
 
-def resolve_inheritance(merged_data, verbose=False):
-    """Resolve inheritance in merged_data['globals']."""
+def record_provenance(source, merged, locations, file_index, nodes, list_index=None):
+    """
+    Record where the nodes of one merged source file ended up.
+
+    Walks source alongside the merged tree and adds ``[file_index, line, col]``
+    to nodes for each JSON pointer in the merged tree. Scalars in mappings take
+    the location of the last file to set them, as in ``deep_merge``; mappings
+    and list items keep the first file that defined them. Merged list items are
+    found by value, since de-duplication shifts their positions.
+    """
+    list_index = {} if list_index is None else list_index
+    stack = [(source, merged, (), "")]
+    while stack:
+        node, target, path, pointer = stack.pop()
+        if isinstance(node, Mapping):
+            children = []
+            for key, value in node.items():
+                child = target.get(key) if isinstance(target, Mapping) else None
+                children.append((key, _json_key(key), value, child))
+        elif isinstance(node, list) and isinstance(target, list):
+            positions = list_index.get(id(target))
+            if positions is None:
+                positions = {}
+                for i, item in enumerate(target):
+                    try:
+                        positions.setdefault(canonical_key(item), i)
+                    except TypeError:
+                        pass
+                list_index[id(target)] = positions
+            children = []
+            for i, value in enumerate(node):
+                try:
+                    merged_i = positions.get(canonical_key(value))
+                except TypeError:
+                    merged_i = next(
+                        (j for j, item in enumerate(target) if item == value), None
+                    )
+                if merged_i is not None:
+                    children.append((i, str(merged_i), value, target[merged_i]))
+        else:
+            continue
+        for key, token, value, child in children:
+            child_path = path + (key,)
+            child_pointer = f"{pointer}/{escape_token(token)}"
+            location = locations.get(child_path)
+            if location is not None:
+                entry = [file_index, *location]
+                if isinstance(value, (Mapping, list)) or isinstance(node, list):
+                    nodes.setdefault(child_pointer, entry)
+                else:
+                    nodes[child_pointer] = entry
+            if isinstance(value, (Mapping, list)):
+                stack.append((value, child, child_path, child_pointer))
+
+
+MEMBER_SECTIONS = ("instance", "static", "properties")
+
+
+def strongly_connected_components(graph):
+    """
+    Return the strongly connected components of graph (node -> successors).
+
+    Uses an iterative Tarjan's algorithm so deep hierarchies cannot hit the
+    recursion limit. Every component is listed after all components it points
+    to, i.e. parents come before the classes that inherit from them.
+    """
+    index, low, on_stack, stack, components = {}, {}, set(), [], []
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, successors = work[-1]
+            for succ in successors:
+                if succ not in index:
+                    index[succ] = low[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph[succ])))
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    low[caller] = min(low[caller], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+    return components
+
+
+def linearize_inheritance(merged_globals):
+    """
+    Compute each class's lookup order: itself, then its ancestors by precedence.
+
+    Later parents shadow earlier ones, matching how members are combined.
+    Inheritance cycles are found as strongly connected components; edges inside
+    a cycle are ignored. Returns ``(lineage, cycles)``.
+    """
+    graph = {}
+    for class_name, class_data in merged_globals.items():
+        parents = class_data.get("inherits", []) if isinstance(class_data, dict) else []
+        if not isinstance(parents, list):
+            parents = []
+        for parent in parents:
+            if not isinstance(parent, str):
+                print(f"⚠️ Ignoring non-string parent of {class_name}: {parent!r}")
+        graph[class_name] = [
+            p for p in parents if isinstance(p, str) and p in merged_globals
+        ]
+
+    lineage, cycles = {}, []
+    for component in strongly_connected_components(graph):
+        in_cycle = set()
+        if len(component) > 1 or component[0] in graph[component[0]]:
+            in_cycle = set(component)
+            cycles.append(sorted(component))
+        for class_name in component:
+            order = [class_name]
+            for parent in reversed(graph[class_name]):
+                if parent not in in_cycle:
+                    order.extend(lineage[parent])
+            lineage[class_name] = list(dict.fromkeys(order))
+    return lineage, cycles
+
+
+def resolve_inheritance(merged_data, verbose=False, materialize=False):
+    """
+    Resolve inheritance in merged_data['globals'].
+
+    Returns a map of class name to its combined members per section. Sections
+    are read-only ChainMaps over the own members of the class and each of its
+    ancestors, so parent member maps are shared rather than copied and each
+    class only costs one layer per ancestor, however many members they hold.
+
+    With ``materialize``, the result is also written to
+    ``merged_data['inheritance']``: per class, its ``ancestors`` in lookup order
+    and a flattened ``members`` table naming the class each member comes from.
+    """
     merged_globals = merged_data.get("globals")
     if not merged_globals or not isinstance(merged_globals, dict):
-        return
+        return {}
 
-    # Helper function to merge members
-    def merge_members(parent, child):
-        merged = copy.deepcopy(parent)
-        for mtype in ["instance", "static", "properties"]:
-            if mtype in child:
-                if mtype not in merged:
-                    merged[mtype] = {}
-                merged[mtype].update(child.get(mtype, {}))
-        return merged
-
-    # Helper function to get inherited members recursively
-    def get_members(class_name, all_classes, cache, visited=None):
-        visited = visited or set()
-        if class_name in visited:
-            return {"instance": {}, "static": {}, "properties": {}}
-        if class_name in cache:
-            return cache[class_name]
-
-        visited.add(class_name)
-        class_data = all_classes.get(class_name, {})
-        if not isinstance(class_data, dict):
-            visited.remove(class_name)
-            cache[class_name] = {"instance": {}, "static": {}, "properties": {}}
-            return cache[class_name]
-
-        # Get own members
-        own_members = {
-            t: class_data.get(t, {}) for t in ["instance", "static", "properties"]
+    def own_section(class_name, mtype):
+        class_data = merged_globals[class_name]
+        members = class_data.get(mtype, {}) if isinstance(class_data, dict) else {}
+        return MappingProxyType(members if isinstance(members, dict) else {})
+
+    lineage, cycles = linearize_inheritance(merged_globals)
+    for cycle in cycles:
+        print(f"⚠️ Inheritance cycle ignored between: {', '.join(cycle)}")
+
+    views = {
+        class_name: {
+            t: ChainMap(*(own_section(a, t) for a in order)) for t in MEMBER_SECTIONS
         }
-        for t in own_members:
-            if not isinstance(own_members[t], dict):
-                own_members[t] = {}
+        for class_name, order in lineage.items()
+    }
 
-        # Get and merge parent members
-        parents = class_data.get("inherits", [])
-        if not isinstance(parents, list):
-            parents = []
+    if materialize:
+        classes = {}
+        for class_name in merged_globals:
+            order = lineage[class_name]
+            members = {}
+            for t in MEMBER_SECTIONS:
+                # Walk from lowest to highest precedence so the owner that wins
+                # a lookup is recorded last, in ChainMap iteration order.
+                owners = {}
+                for ancestor in reversed(order):
+                    for name in own_section(ancestor, t):
+                        owners[name] = ancestor
+                members[t] = owners
+            classes[class_name] = {"ancestors": order[1:], "members": members}
+        merged_data["inheritance"] = {"classes": classes, "cycles": cycles}
+        if verbose:
+            print(f"Materialized inheritance tables for {len(classes)} class(es)")
 
-        combined = {"instance": {}, "static": {}, "properties": {}}
-        for parent in parents:
-            if parent in all_classes:
-                parent_members = get_members(parent, all_classes, cache, visited.copy())
-                combined = merge_members(combined, parent_members)
+    return views
+
+
+def _json_key(key):
+    """Render a mapping key the way json.dump does."""
+    if isinstance(key, str):
+        return key
+    if key is True or key is False or key is None:
+        return json.dumps(key)
+    if isinstance(key, float):
+        return json.dumps(key)
+    return str(key)
+
+
+def json_normalize(node):
+    """
+    Return a copy of node as json.load would return it after json.dump.
+
+    YAML allows non-string mapping keys (``0: RUSSIA``) that the JSON artifact
+    turns into strings, and the exporters rely on that. In-process consumers of
+    a fresh merge use this instead of a JSON round-trip.
+    """
+    if isinstance(node, dict):
+        return {_json_key(k): json_normalize(v) for k, v in node.items()}
+    if isinstance(node, list):
+        return [json_normalize(v) for v in node]
+    return node
+
+
+def _byte_len(text):
+    # Output files are written with newlines translated to os.linesep
+    return len(text.encode("utf-8")) + text.count("\n") * (len(os.linesep) - 1)
+
+
+def sort_keys(node):
+    """
+    Return a copy of node with every mapping's keys in sorted order.
+
+    Keys are ordered by their JSON form, so the JSON output of the sorted tree
+    is canonical: equal schemas give byte-identical files whatever order the
+    YAML files were merged in.
+    """
+    if isinstance(node, dict):
+        return {k: sort_keys(node[k]) for k in sorted(node, key=lambda k: _json_key(k))}
+    if isinstance(node, list):
+        return [sort_keys(v) for v in node]
+    return node
+
+
+def iter_json(data, compact=False, index=None):
+    """
+    Serialize data as JSON piece by piece.
+
+    The pieces join to exactly ``json.dump(data, indent=2, ensure_ascii=False)``
+    or, with compact, to ``json.dumps(data, separators=(",", ":"),
+    ensure_ascii=False)``. Each globals/types entry is encoded on its own, so
+    at most one entry's text is held in memory at a time. Nested values are
+    re-indented after encoding, which is safe because JSON strings never
+    contain raw newlines.
+
+    If an index dict is given, it is filled with the byte-offset index of the
+    output (see schema_io.py): the byte range of every top-level section and
+    every globals/types entry.
+    """
+    if compact:
+        options = {"separators": (",", ":"), "ensure_ascii": False}
+        colon, newline = ":", ("", "", "")
+    else:
+        options = {"indent": 2, "ensure_ascii": False}
+        colon, newline = ": ", ("\n", "\n  ", "\n    ")
+    if index is None:
+        index = {}
+    index.update(version=INDEX_VERSION, sections={})
+    offset = 0
+
+    def emit(text):
+        nonlocal offset
+        offset += _byte_len(text)
+        return text
+
+    def encode(value, depth):
+        text = json.dumps(value, **options)
+        return text if compact else text.replace("\n", "\n" + "  " * depth)
+
+    if not isinstance(data, dict) or not data:
+        yield emit(json.dumps(data, **options))
+        index["size"] = offset
+        return
+
+    yield emit("{")
+    for i, (key, value) in enumerate(data.items()):
+        key = _json_key(key)
+        yield emit(f"{',' if i else ''}{newline[1]}{encode(key, 0)}{colon}")
+        start = offset
+        if key in INDEXED_SECTIONS and isinstance(value, dict) and value:
+            ranges = index.setdefault(key, {})
+            yield emit("{")
+            for j, (name, entry) in enumerate(value.items()):
+                name = _json_key(name)
+                yield emit(f"{',' if j else ''}{newline[2]}{encode(name, 0)}{colon}")
+                entry_start = offset
+                yield emit(encode(entry, 2))
+                ranges[name] = [entry_start, offset]
+            yield emit(f"{newline[1]}}}")
+        else:
+            yield emit(encode(value, 1))
+        index["sections"][key] = [start, offset]
+    yield emit(f"{newline[0]}}}")
+    index["size"] = offset
+
+
+def _write_json(data, outfile, compact=False, index=None):
+    outfile.writelines(iter_json(data, compact, index))
+
+
+def _write_yaml(data, outfile, compact=False, index=None):
+    # YAML output has no compact form or byte-offset index; its key order
+    # follows the merged tree
+    safe_dump(data, outfile, allow_unicode=True, sort_keys=False, indent=2)
+
+
+OUTPUT_WRITERS = {"json": _write_json, "yaml": _write_yaml}
+
+
+def write_output(merged_data, fmt, path, compact=False, index=None):
+    """
+    Stream merged_data to path in the given output format.
+
+    An existing file with identical content is left untouched so its mtime is
+    preserved. For JSON, a given index dict is filled with the byte-offset
+    index of the output as it is written. Returns True if the file was written.
+    """
+    return write_stream_if_changed(
+        path, lambda f: OUTPUT_WRITERS[fmt](merged_data, f, compact, index)
+    )
 
-        final = merge_members(combined, own_members)
-        cache[class_name] = final
-        visited.remove(class_name)
-        return final
 
-    # Process all classes
-    cache = {}
-    for class_name in merged_globals:
-        if class_name not in cache:
-            get_members(class_name, merged_globals, cache)
+def _write_output_indexed(merged_data, fmt, path, compact=False):
+    # Worker processes can't fill the caller's dict, so return the index
+    index = {}
+    write_output(merged_data, fmt, path, compact, index)
+    return index
+
+
+def output_spec(value):
+    """Parse a FORMAT:PATH output argument."""
+    fmt, sep, path = value.partition(":")
+    if not sep or not path or fmt not in OUTPUT_WRITERS:
+        raise argparse.ArgumentTypeError(
+            f"expected FORMAT:PATH with FORMAT one of {', '.join(OUTPUT_WRITERS)}"
+        )
+    return fmt, path
+
+
+def merge_schema(
+    root,
+    subdirs=None,
+    ignore_files=(),
+    jobs=1,
+    cache_path=None,
+    inheritance_table=False,
+    verbose=False,
+    parse_cache=None,
+    provenance=None,
+):
+    """
+    Parse and merge every YAML file under root, then resolve inheritance.
+
+    Long-running callers can pass an already loaded ``parse_cache`` to keep
+    parsed files in memory between merges; it is then only written back to
+    disk if cache_path is also given. If a ``provenance`` index (see
+    ``provenance.new_provenance``) is passed, it is filled with the source
+    location of every merged node.
+
+    Returns ``(merged_data, count)`` where count is the number of files merged.
+    """
+    # Find YAML files
+    abs_root = os.path.abspath(root)
+    ignored_files = [os.path.abspath(os.path.join(abs_root, f)) for f in ignore_files]
+
+    search_paths = (
+        [os.path.join(abs_root, d) for d in subdirs] if subdirs else [abs_root]
+    )
+    search_paths = [p for p in search_paths if os.path.isdir(p)]
+
+    if parse_cache is None and cache_path:
+        parse_cache = load_parse_cache(cache_path)
+    entries = parse_cache["entries"] if parse_cache else None
+
+    # Parse phase: independent per file, optionally fanned out to workers
+    filepaths = find_yaml_files(search_paths, abs_root, ignored_files, verbose)
+    results = parse_files(filepaths, jobs, entries, provenance is not None)
+
+    # Merge phase: strictly in discovery order so output is deterministic
+    merged_data, count, cache_hits, merged_files = {}, 0, 0, []
+    for filepath, (data, error, hit, locations) in zip(filepaths, results):
+        if error is not None:
+            print(f"✖ Error processing {filepath}: {error}")
+            continue
+        cache_hits += hit
+        try:
+            if data:
+                merged_data = deep_merge(data, merged_data)
+                merged_files.append((filepath, data, locations))
+                count += 1
+                if verbose:
+                    print(f"Merged: {filepath}")
+        except Exception as e:
+            print(f"✖ Error processing {filepath}: {e}")
+
+    if parse_cache is not None:
+        # Drop entries for files that were deleted or are no longer searched.
+        seen = {os.path.abspath(fp) for fp in filepaths}
+        for stale in set(entries) - seen:
+            del entries[stale]
+        try:
+            if cache_path:
+                save_parse_cache(cache_path, parse_cache)
+        except OSError as e:
+            print(f"⚠️ Could not write parse cache {cache_path}: {e}")
+        if verbose:
+            print(
+                f"Parse cache: {cache_hits} hit(s), {len(filepaths) - cache_hits} parsed"
+            )
+
+    if provenance is not None:
+        list_index = {}
+        for filepath, data, locations in merged_files:
+            rel_path = os.path.relpath(os.path.abspath(filepath), abs_root)
+            provenance["files"].append(rel_path.replace(os.sep, "/"))
+            file_index = len(provenance["files"]) - 1
+            record_provenance(
+                data,
+                merged_data,
+                locations,
+                file_index,
+                provenance["nodes"],
+                list_index,
+            )
+            # nodes keeps one file per node; entries lists every definer
+            for section in ("globals", "types"):
+                if isinstance(data, Mapping) and isinstance(data.get(section), Mapping):
+                    for name in data[section]:
+                        pointer = f"/{section}/{escape_token(_json_key(name))}"
+                        provenance["entries"].setdefault(pointer, []).append(file_index)
+
+    if count:
+        resolve_inheritance(merged_data, verbose, inheritance_table)
+    return merged_data, count
+
+
+def write_outputs(merged_data, outputs, jobs=1, compact=False, indexes=None):
+    """
+    Write merged_data to every ``(format, path)`` output.
+
+    With compact, JSON outputs are written without indentation. With more
+    than one job, independent outputs are serialized in parallel worker
+    processes. If an indexes dict is given, it maps the path of every JSON
+    output that was written to its byte-offset index, collected during the
+    same pass. Returns one exception (or None) per output.
+    """
+    if len(outputs) > 1 and jobs > 1:
+        # Serialize independent formats in parallel from the one merged tree
+        with ProcessPoolExecutor(max_workers=min(jobs, len(outputs))) as pool:
+            futures = [
+                pool.submit(_write_output_indexed, merged_data, fmt, path, compact)
+                for fmt, path in outputs
+            ]
+            errors = [future.exception() for future in futures]
+        if indexes is not None:
+            for (fmt, path), future, error in zip(outputs, futures, errors):
+                if fmt == "json" and error is None:
+                    indexes[path] = future.result()
+        return errors
+
+    errors = []
+    for fmt, path in outputs:
+        try:
+            index = {}
+            write_output(merged_data, fmt, path, compact, index)
+            if indexes is not None and fmt == "json":
+                indexes[path] = index
+            errors.append(None)
+        except Exception as e:  # noqa: BLE001 - reported per output, as in workers
+            errors.append(e)
+    return errors
+
+
+def write_hashes(merged_data, outputs):
+    """
+    Write the Merkle hash sidecar next to each JSON output (or the first output).
+
+    Call after writing the outputs: each sidecar records the size and mtime of
+    the output it belongs to, so readers can tell when it is stale.
+
+    Returns the sidecar paths that were written or already up to date.
+    """
+    json_paths = [path for fmt, path in outputs if fmt == "json"]
+    tree = hash_schema(json_normalize(merged_data))
+    paths = []
+    for source in json_paths or [outputs[0][1]]:
+        paths.append(hashes_path(source))
+        tree["source"] = source_stamp(source)
+        write_text_if_changed(paths[-1], dumps_hashes(tree))
+    return paths
+
+
+def write_index(indexes):
+    """
+    Write the byte-offset index next to each JSON output.
+
+    indexes maps each JSON output path to the index collected while writing it
+    (see write_outputs). Each index also records the size, mtime and digest of
+    its JSON file.
+
+    Returns the sidecar paths that were written or already up to date.
+    """
+    paths = []
+    for source, index in indexes.items():
+        paths.append(index_path(source))
+        index["source"] = index_stamp(source)
+        write_text_if_changed(paths[-1], json.dumps(index, separators=(",", ":")))
+    return paths
+
+
+def write_snapshots(merged_data, outputs):
+    """
+    Write a binary snapshot next to each JSON output; call after writing them.
+
+    Returns the snapshot paths that were written or already up to date.
+    """
+    json_paths = [path for fmt, path in outputs if fmt == "json"]
+    schema = json_normalize(merged_data) if json_paths else None
+    for path in json_paths:
+        write_snapshot(schema, path)
+    return [snapshot_path(p) for p in json_paths]
+
+
+def interned_path(output_path):
+    """Interned copy of a merged output: ``schema.json`` -> ``schema.interned.json``."""
+    return f"{os.path.splitext(output_path)[0]}.interned.json"
+
+
+def write_interned(merged_data, outputs):
+    """
+    Write the interned form of the schema next to each JSON output.
+
+    Returns ``(json_path, interned_path, saved)`` per JSON output, where saved
+    is the fraction of the JSON output's size the interned copy saves.
+    """
+    text = json.dumps(
+        intern_schema(json_normalize(merged_data)),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    written = []
+    for fmt, path in outputs:
+        if fmt == "json":
+            write_text_if_changed(interned_path(path), text)
+            full_size = os.path.getsize(path)
+            saved = (
+                1 - os.path.getsize(interned_path(path)) / full_size if full_size else 0
+            )
+            written.append((path, interned_path(path), saved))
+    return written
+
+
+def write_provenance(provenance, outputs):
+    """
+    Write the provenance index next to each JSON output (or the first output).
+
+    Call after writing the outputs; like the hash sidecar, it records the size
+    and mtime of its output.
+
+    Returns the sidecar paths that were written or already up to date.
+    """
+    json_paths = [path for fmt, path in outputs if fmt == "json"]
+    paths = []
+    for source in json_paths or [outputs[0][1]]:
+        paths.append(provenance_path(source))
+        sidecar = {**provenance, "source": source_stamp(source)}
+        write_text_if_changed(paths[-1], dumps_provenance(sidecar))
+    return paths
 
 
 def main():
     parser = argparse.ArgumentParser(description="Merge YAML schema files.")
-    parser.add_argument("output_filepath", help="Output file path for merged schema")
+    parser.add_argument(
+        "output_filepath", nargs="?", help="Output file path for merged schema"
+    )
     parser.add_argument(
         "--root", "-r", default=os.getcwd(), help="Root directory to search"
     )
@@ -102,85 +829,183 @@ def main():
         "--subdirs", "-s", nargs="*", help="Specific subdirectories to search"
     )
     parser.add_argument(
-        "--format", "-f", choices=["json", "yaml"], default="json", help="Output format"
+        "--format",
+        "-f",
+        choices=list(OUTPUT_WRITERS),
+        default="json",
+        help="Output format",
+    )
+    parser.add_argument(
+        "--out",
+        "-o",
+        action="append",
+        default=[],
+        type=output_spec,
+        metavar="FORMAT:PATH",
+        help="Additional output written from the same merge (repeatable)",
     )
     parser.add_argument(
         "--ignore-files", "-i", nargs="*", default=[], help="Files to ignore"
     )
+    parser.add_argument(
+        "--cache",
+        "-c",
+        help="Parse cache file; unchanged YAML files are loaded from it instead of re-parsed",
+    )
+    parser.add_argument(
+        "--inheritance-table",
+        action="store_true",
+        help="Add an 'inheritance' section with each class's ancestors and flattened members",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON outputs without indentation or spaces",
+    )
+    parser.add_argument(
+        "--sort-keys",
+        action="store_true",
+        help="Sort every mapping's keys so the output is canonical and can be "
+        "hashed or diffed byte for byte",
+    )
+    add_compress_argument(parser)
+    parser.add_argument(
+        "--hashes",
+        action="store_true",
+        help="Write Merkle hashes of every global, type, member and param to a "
+        "<name>.hashes.json sidecar next to the JSON output",
+    )
+    parser.add_argument(
+        "--provenance",
+        action="store_true",
+        help="Write the source file, line and column of every merged node to a "
+        "<name>.provenance.json sidecar next to the JSON output",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Write a <name>.index.json sidecar with the byte range of every "
+        "global and type in the JSON output, for random access",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Write a <name>.snapshot binary copy of the JSON output that the "
+        "tools load instead of the JSON while it is fresh",
+    )
+    parser.add_argument(
+        "--interned",
+        action="store_true",
+        help="Write a <name>.interned.json copy of the JSON output with a string "
+        "table and de-duplicated subtrees; the tools expand it transparently",
+    )
+    parser.add_argument(
+        "--shards",
+        metavar="DIR",
+        help="Also write one JSON file per global and type plus a manifest of "
+        "their hashes and dependencies to DIR",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for YAML parsing and output writing (0 = one per CPU)",
+    )
     parser.add_argument("-v", "--verbose", action="store_true", help="Verbose output")
     args = parser.parse_args()
+    outputs = list(args.out)
+    if args.output_filepath:
+        outputs.insert(0, (args.format, args.output_filepath))
+    if not outputs:
+        parser.error("an output file path or at least one --out is required")
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if args.verbose:
+        print(f"YAML backend: {describe_backend()}")
 
-    # Find YAML files
     abs_root = os.path.abspath(args.root)
-    ignored_files = [
-        os.path.abspath(os.path.join(abs_root, f)) for f in args.ignore_files
-    ]
-
     if not os.path.isdir(abs_root):
         print(f"✖ Root directory not found: {abs_root}")
         sys.exit(1)
 
-    search_paths = (
-        [os.path.join(abs_root, d) for d in args.subdirs]
-        if args.subdirs
-        else [abs_root]
+    provenance = new_provenance(args.root) if args.provenance else None
+    merged_data, count = merge_schema(
+        abs_root,
+        subdirs=args.subdirs,
+        ignore_files=args.ignore_files,
+        jobs=jobs,
+        cache_path=args.cache,
+        inheritance_table=args.inheritance_table,
+        verbose=args.verbose,
+        provenance=provenance,
     )
-    search_paths = [p for p in search_paths if os.path.isdir(p)]
-
-    # Process files
-    merged_data, count = {}, 0
-    for path in search_paths:
-        for dirpath, _, filenames in os.walk(path):
-            for filename in filenames:
-                if not filename.endswith((".yaml", ".yml")):
-                    continue
-
-                filepath = os.path.join(dirpath, filename)
-                abs_path = os.path.abspath(filepath)
-
-                if not abs_path.startswith(abs_root):
-                    if args.verbose:
-                        print(f"Skipping file outside root: {filepath}")
-                    continue
-
-                if abs_path in ignored_files:
-                    continue
-
-                try:
-                    with open(filepath, "r", encoding="utf-8") as f:
-                        data = yaml.safe_load(f)
-                    if data:
-                        merged_data = deep_merge(data, merged_data)
-                        count += 1
-                        if args.verbose:
-                            print(f"Merged: {filepath}")
-                except Exception as e:
-                    print(f"✖ Error processing {filepath}: {e}")
-
     if count == 0:
         print("⚠️ No YAML files were found or processed.")
         return
 
-    # Process inheritance and write output
-    resolve_inheritance(merged_data, args.verbose)
-
-    output_dir = os.path.dirname(args.output_filepath)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if args.sort_keys:
+        merged_data = sort_keys(merged_data)
 
-    try:
-        with open(args.output_filepath, "w", encoding="utf-8") as outfile:
-            if args.format == "json":
-                json.dump(merged_data, outfile, indent=2, ensure_ascii=False)
-            else:
-                yaml.dump(
-                    merged_data, outfile, allow_unicode=True, sort_keys=False, indent=2
-                )
-        print(
-            f"✅ Successfully merged {count} YAML file(s) into: {args.output_filepath}"
-        )
-    except Exception as e:
-        print(f"✖ Error writing output file: {e}")
+    failed = False
+    indexes = {} if args.index else None
+    errors = write_outputs(merged_data, outputs, jobs, args.compact, indexes)
+    for (_, path), error in zip(outputs, errors):
+        if error is not None:
+            print(f"✖ Error writing output file {path}: {error}")
+            failed = True
+        else:
+            print(f"✅ Successfully merged {count} YAML file(s) into: {path}")
+            try:
+                for compressed_path in compress_outputs([path], args.compress):
+                    print(f"✅ Wrote compressed output to: {compressed_path}")
+            except OSError as e:
+                print(f"✖ Error compressing output file {path}: {e}")
+                failed = True
+    if args.hashes:
+        try:
+            for path in write_hashes(merged_data, outputs):
+                print(f"✅ Wrote schema hashes to: {path}")
+        except OSError as e:
+            print(f"✖ Error writing schema hashes: {e}")
+            failed = True
+    if args.snapshot and not failed:
+        try:
+            for path in write_snapshots(merged_data, outputs):
+                print(f"✅ Wrote schema snapshot to: {path}")
+        except OSError as e:
+            print(f"✖ Error writing schema snapshot: {e}")
+            failed = True
+    if args.interned:
+        try:
+            for _, path, saved in write_interned(merged_data, outputs):
+                print(f"✅ Wrote interned schema to: {path} ({saved:.0%} smaller)")
+        except OSError as e:
+            print(f"✖ Error writing interned schema: {e}")
+            failed = True
+    if args.index:
+        try:
+            for path in write_index(indexes):
+                print(f"✅ Wrote byte-offset index to: {path}")
+        except OSError as e:
+            print(f"✖ Error writing byte-offset index: {e}")
+            failed = True
+    if args.shards:
+        try:
+            written = write_shards(json_normalize(merged_data), args.shards)
+            print(
+                f"✅ Wrote sharded schema to: {args.shards} ({written} shard(s) changed)"
+            )
+        except OSError as e:
+            print(f"✖ Error writing sharded schema: {e}")
+            failed = True
+    if provenance is not None:
+        try:
+            for path in write_provenance(provenance, outputs):
+                print(f"✅ Wrote provenance index to: {path}")
+        except OSError as e:
+            print(f"✖ Error writing provenance index: {e}")
+            failed = True
+    if failed:
         sys.exit(1)
 
 
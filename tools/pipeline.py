@@ -0,0 +1,600 @@
+#!/usr/bin/env python3
+"""
+Run merge, validation, type checks, verification and the exporters as one build.
+Usage: python pipeline.py build [--root <dir>] [--dist <dir>] [--targets <name>...]
+                              [--skip <stage>...] [-j N] [--reproducible]
+                              [--build-cache <file> | --no-build-cache]
+                              [--watch [--interval <seconds>]] [-v]
+
+The schema is merged once and every later stage works on the same merged tree
+instead of reloading dist/dcs-world-api-schema.json from disk. Stages form a
+dependency graph; with -j N independent stages run in N worker processes.
+Stages whose merged schema, tool source and options are unchanged since the
+last successful run are replayed from the build cache instead of re-run.
+
+With --watch, the schema tree is polled for edits after the first build. Parsed
+files stay in memory so only changed files are re-read, source validation only
+checks the changed files, and unchanged stages come from the build cache.
+"""
+
+import argparse
+import copy
+import io
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+import export_golang
+import export_lua
+import export_python
+import export_selene_yaml
+import export_typescript
+import validate_types
+import verify
+from build_cache import (
+    build_key,
+    load_build_cache,
+    lookup,
+    save_build_cache,
+    schema_digest,
+    sha256_file,
+    store,
+)
+from compressed import add_compress_argument, compress_outputs, open_text
+from merge import (
+    find_yaml_files,
+    json_normalize,
+    load_parse_cache,
+    merge_schema,
+    save_parse_cache,
+    write_hashes,
+    write_outputs,
+    write_provenance,
+)
+from provenance import load_provenance, new_provenance, provenance_path
+from snapshot import snapshot_path, write_snapshot
+from validate import DEFAULT_RESULT_CACHE, collect, resolve_schema, validate_paths
+from validate_types import check_types
+from verify import verify_schema
+
+SCHEMA_JSON = "dcs-world-api-schema.json"
+SCHEMA_YAML = "dcs-world-api-schema.yaml"
+DEFAULT_API_DUMP = os.path.join("reference_data", "dcs_world_api_dump_latest.json")
+DEFAULT_CACHE = os.path.join(".cache", "merge-parse.pickle")
+DEFAULT_BUILD_CACHE = os.path.join(".cache", "build-cache.json")
+
+
+def _export_lua(schema, path, schema_json, reproducible=False):
+    export_lua.export_to_lua(
+        {**schema, "source_file_path": schema_json}, path, reproducible
+    )
+
+
+def _export_typescript(schema, path, schema_json, reproducible=False):
+    # The TypeScript exporter renames Object in place, so give it its own copy
+    export_typescript.export_to_typescript(copy.deepcopy(schema), path)
+
+
+def _export_golang(schema, path, schema_json, reproducible=False):
+    export_golang.export_to_golang(schema, path)
+
+
+def _export_python(schema, path, schema_json, reproducible=False):
+    export_python.export_to_python(schema, path)
+
+
+def _export_selene(schema, path, schema_json, reproducible=False):
+    export_selene_yaml.write_selene_yaml(schema, path)
+
+
+# Exporter name -> (output file name in dist, export function)
+EXPORTERS = {
+    "lua": ("dcs-world-api.lua", _export_lua),
+    "typescript": ("dcs-world-api.d.ts", _export_typescript),
+    "golang": ("dcs-world-api.go", _export_golang),
+    "python": ("dcs_world_api.py", _export_python),
+    "selene": ("dcs-world-selene.yml", _export_selene),
+}
+CHECK_STAGES = ["validate", "validate-types", "verify"]
+# Modules whose source decides each cacheable stage's result
+STAGE_MODULES = {
+    "validate-types": validate_types,
+    "verify": verify,
+    "export:lua": export_lua,
+    "export:typescript": export_typescript,
+    "export:golang": export_golang,
+    "export:python": export_python,
+    "export:selene": export_selene_yaml,
+}
+
+
+def run_merge(args, parse_cache=None):
+    provenance = new_provenance(args.root) if args.provenance else None
+    merged_data, count = merge_schema(
+        args.root,
+        jobs=args.jobs,
+        cache_path=None if parse_cache is not None else args.cache,
+        verbose=args.verbose,
+        parse_cache=parse_cache,
+        provenance=provenance,
+    )
+    if count == 0:
+        print("⚠️ No YAML files were found or processed.")
+        return None
+    outputs = [
+        ("json", os.path.join(args.dist, SCHEMA_JSON)),
+        ("yaml", os.path.join(args.dist, SCHEMA_YAML)),
+    ]
+    errors = write_outputs(merged_data, outputs, args.jobs)
+    for (_, path), error in zip(outputs, errors):
+        if error is not None:
+            print(f"✖ Error writing output file {path}: {error}")
+            return None
+        print(f"✅ Successfully merged {count} YAML file(s) into: {path}")
+    for path in compress_outputs([path for _, path in outputs], args.compress):
+        print(f"✅ Wrote compressed output to: {path}")
+    if args.hashes:
+        for path in write_hashes(merged_data, outputs):
+            print(f"✅ Wrote schema hashes to: {path}")
+    if provenance is not None:
+        for path in write_provenance(provenance, outputs):
+            print(f"✅ Wrote provenance index to: {path}")
+    # Later stages see exactly what they would get from loading the JSON output
+    schema = json_normalize(merged_data)
+    if args.snapshot:
+        write_snapshot(schema, outputs[0][1])
+        print(f"✅ Wrote schema snapshot to: {snapshot_path(outputs[0][1])}")
+    return schema
+
+
+def run_check(stage, schema, args):
+    """Run one validation stage against the merged schema; True on success."""
+    if stage == "validate":
+        schema_path = resolve_schema([args.root], args.yaml_schema)
+        if args.validate_files is not None:
+            # Watch mode: only the files that changed since the last build
+            if not args.validate_files:
+                print("No changed files to validate")
+                return True
+            # Too few files to pay for starting validation workers
+            return validate_paths(
+                args.validate_files,
+                schema_path,
+                quiet=True,
+                cache_path=args.validate_cache,
+            )
+        files = collect([args.root])
+        if not files:
+            print("✖ No YAML files found")
+            return False
+        return validate_paths(
+            files,
+            schema_path,
+            quiet=True,
+            jobs=args.jobs,
+            cache_path=args.validate_cache,
+        )
+    if stage == "validate-types":
+        provenance = None
+        if args.provenance:
+            provenance = load_provenance(
+                provenance_path(os.path.join(args.dist, SCHEMA_JSON))
+            )
+        return check_types(schema, args.root, provenance)
+    if stage == "verify":
+        with open_text(args.api_dump) as f:
+            api = json.load(f)
+        return not verify_schema(schema, api)
+    raise ValueError(f"unknown stage: {stage}")
+
+
+def run_export(target, schema, args):
+    filename, export = EXPORTERS[target]
+    path = os.path.join(args.dist, filename)
+    export(schema, path, os.path.join(args.dist, SCHEMA_JSON), args.reproducible)
+    for compressed_path in compress_outputs([path], args.compress):
+        print(f"Compressed copy written to {compressed_path}")
+    return True
+
+
+def stage_outputs(name, args):
+    """Files a stage writes, which must be intact for a cache hit to count."""
+    if name.startswith("export:"):
+        path = os.path.join(args.dist, EXPORTERS[name.split(":", 1)[1]][0])
+        return [path] + [f"{path}.{codec}" for codec in args.compress]
+    return []
+
+
+def stage_key(name, digest, args):
+    """
+    Build-cache key for a stage, or None if the stage is never cached.
+
+    Source validation reads the YAML tree directly, so it always runs; it skips
+    unchanged files with its own per-file result cache instead.
+    """
+    module = STAGE_MODULES.get(name)
+    if module is None:
+        return None
+    tools = [module.__file__, __file__, sys.modules["build_cache"].__file__]
+    if name == "export:selene":
+        tools.append(sys.modules["yaml_io"].__file__)
+    if name.startswith("export:") and args.compress:
+        tools.append(sys.modules["compressed"].__file__)
+    options = {"outputs": stage_outputs(name, args)}
+    if name == "export:lua":
+        options["schema_json"] = os.path.join(args.dist, SCHEMA_JSON)
+        options["reproducible"] = args.reproducible
+    if name == "verify":
+        options["api_dump"] = sha256_file(args.api_dump)
+    if name == "validate-types" and args.provenance:
+        # Which file defines a type is not part of the merged schema
+        options["provenance"] = sha256_file(
+            provenance_path(os.path.join(args.dist, SCHEMA_JSON))
+        )
+        tools.append(sys.modules["provenance"].__file__)
+    sources = {os.path.basename(path): sha256_file(path) for path in tools}
+    return build_key(name, digest, sources, options)
+
+
+# Schemas unpickled by this worker process, keyed by snapshot path
+_worker_schemas = {}
+
+
+def _schema_from(snapshot):
+    """Return the merged schema, loading a pickled snapshot once per worker."""
+    if not isinstance(snapshot, str):
+        return snapshot
+    if snapshot not in _worker_schemas:
+        with open(snapshot, "rb") as f:
+            _worker_schemas[snapshot] = pickle.load(f)
+    return _worker_schemas[snapshot]
+
+
+def run_stage(name, args, snapshot):
+    """
+    Run one stage after merge, capturing its output.
+
+    This is the worker-process entry point; snapshot is either the schema itself
+    or the path of its pickled snapshot. Returns ``(ok, output, seconds)``.
+    """
+    buf = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(buf), redirect_stderr(buf):
+        try:
+            schema = None if name == "validate" else _schema_from(snapshot)
+            if name.startswith("export:"):
+                ok = run_export(name.split(":", 1)[1], schema, args)
+            else:
+                ok = run_check(name, schema, args)
+        except Exception as e:  # noqa: BLE001 - a failing stage must not stop the rest
+            print(f"✖ {name} failed: {e}")
+            ok = False
+    return bool(ok), buf.getvalue(), time.perf_counter() - start
+
+
+def stage_graph(args):
+    """Build the stage DAG as a map of stage name -> names it depends on."""
+    graph = {"merge": []}
+    for stage in CHECK_STAGES:
+        if stage not in args.skip:
+            # Source validation reads the YAML tree, not the merged schema
+            graph[stage] = [] if stage == "validate" else ["merge"]
+    for target in args.targets:
+        graph[f"export:{target}"] = ["merge"]
+    return graph
+
+
+def print_timings(timings, total):
+    symbols = {"ok": "✅", "cached": "♻️", "failed": "❌", "skipped": "⏭️"}
+    print("\nStage timings:")
+    for name, seconds, status in timings:
+        print(f"  {symbols[status]} {name:<20} {seconds * 1000:9.1f} ms")
+    busy = sum(seconds for _, seconds, _ in timings)
+    print(f"     {'total':<20} {total * 1000:9.1f} ms (stages: {busy * 1000:.1f} ms)")
+
+
+def build(args, parse_cache=None):
+    """
+    Run every stage in dependency order.
+
+    Returns ``(ok, schema)``: whether every stage succeeded and the merged
+    schema (None if the merge failed).
+
+    Merge always runs in this process. With more than one job, the remaining
+    stages run in a process pool and receive the merged schema through a pickled
+    snapshot instead of re-reading the JSON artifact. A failing stage only skips
+    the stages that depend on it, and a stage whose build-cache key matches its
+    last successful run is replayed without running.
+    """
+    start = time.perf_counter()
+    graph = stage_graph(args)
+    status, timings, running = {}, [], {}
+    snapshot = schema = None
+    cache = load_build_cache(args.build_cache) if args.build_cache else None
+    keys, digest = {}, None
+
+    def record(name, ok, output, seconds):
+        if output:
+            print(output, end="" if output.endswith("\n") else "\n")
+        status[name] = "ok" if ok else "failed"
+        timings.append((name, seconds, status[name]))
+        print(f"{'✅' if ok else '❌'} {name} ({seconds * 1000:.1f} ms)")
+        if ok and cache is not None and keys.get(name):
+            store(cache, name, keys[name], stage_outputs(name, args), output)
+
+    def replay(name):
+        """Replay a stage from the build cache; True on a hit."""
+        if cache is None or digest is None:
+            return False
+        keys[name] = stage_key(name, digest, args)
+        entry = keys[name] and lookup(cache, name, keys[name])
+        if not entry:
+            return False
+        if entry["log"]:
+            print(entry["log"], end="" if entry["log"].endswith("\n") else "\n")
+        status[name] = "cached"
+        timings.append((name, 0.0, "cached"))
+        print(f"♻️ {name} unchanged, reused cached result")
+        return True
+
+    pool = ProcessPoolExecutor(max_workers=args.jobs) if args.jobs > 1 else None
+    snapshot_file = None
+    try:
+        while graph or running:
+            ready, replayed = [], False
+            for name, deps in list(graph.items()):
+                blocked = [d for d in deps if status.get(d) in ("failed", "skipped")]
+                if blocked:
+                    del graph[name]
+                    status[name] = "skipped"
+                    timings.append((name, 0.0, "skipped"))
+                    print(f"⏭️ {name} skipped: {', '.join(blocked)} did not succeed")
+                elif all(status.get(d) in ("ok", "cached") for d in deps):
+                    del graph[name]
+                    if replay(name):
+                        replayed = True
+                    else:
+                        ready.append(name)
+
+            # Hand pool work out first so it overlaps with anything run here
+            local = []
+            for name in ready:
+                if pool is not None and name != "merge":
+                    running[pool.submit(run_stage, name, args, snapshot)] = name
+                else:
+                    local.append(name)
+
+            for name in local:
+                if name != "merge":
+                    record(name, *run_stage(name, args, snapshot))
+                    continue
+                print("▶ merge")
+                merge_start = time.perf_counter()
+                try:
+                    snapshot = run_merge(args, parse_cache)
+                except Exception as e:  # noqa: BLE001 - reported like a failed stage
+                    print(f"✖ merge failed: {e}")
+                    snapshot = None
+                schema = snapshot
+                if snapshot is not None and cache is not None:
+                    digest = schema_digest(snapshot)
+                if snapshot is not None and pool is not None:
+                    fd, snapshot_file = tempfile.mkstemp(suffix=".pickle")
+                    with os.fdopen(fd, "wb") as f:
+                        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    snapshot = snapshot_file
+                record(
+                    "merge",
+                    snapshot is not None,
+                    "",
+                    time.perf_counter() - merge_start,
+                )
+
+            if local or replayed:
+                continue
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    record(name, *future.result())
+                except Exception as e:  # noqa: BLE001 - reported like a failed stage
+                    record(name, False, f"✖ {name} failed: {e}\n", 0.0)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if snapshot_file:
+            os.remove(snapshot_file)
+        if cache is not None:
+            save_build_cache(args.build_cache, cache)
+
+    print_timings(timings, time.perf_counter() - start)
+    return all(state in ("ok", "cached") for state in status.values()), schema
+
+
+def yaml_signature(root):
+    """Map every YAML file under root to its (mtime, size), for change polling."""
+    abs_root = os.path.abspath(root)
+    signature = {}
+    for path in find_yaml_files([abs_root], abs_root):
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue  # removed while walking; the next poll sees it gone
+        signature[path] = (st.st_mtime_ns, st.st_size)
+    return signature
+
+
+def changed_namespaces(old, new):
+    """Names of the globals and types whose merged definition differs."""
+    changed = []
+    for section in ("globals", "types"):
+        before, after = (old or {}).get(section, {}), (new or {}).get(section, {})
+        for name in sorted(set(before) | set(after)):
+            if before.get(name) != after.get(name):
+                changed.append(f"{section}.{name}")
+    return changed
+
+
+def watch(args):
+    """Build, then rebuild whenever a YAML file under the root changes."""
+    parse_cache = load_parse_cache(args.cache)
+    ok, schema = build(args, parse_cache)
+    seen = yaml_signature(args.root)
+    print(f"\n👀 Watching {args.root} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(args.interval)
+            current = yaml_signature(args.root)
+            if current == seen:
+                continue
+            changed = sorted(p for p in current if current[p] != seen.get(p))
+            removed = sorted(set(seen) - set(current))
+            seen = current
+            print()
+            for path in changed:
+                print(f"✏️ {os.path.relpath(path)} changed")
+            for path in removed:
+                print(f"🗑️ {os.path.relpath(path)} removed")
+            args.validate_files = [Path(path) for path in changed]
+            ok, new_schema = build(args, parse_cache)
+            if new_schema is not None:
+                affected = changed_namespaces(schema, new_schema)
+                print(f"Affected: {', '.join(affected) or 'nothing'}")
+                schema = new_schema
+            print(f"\n👀 Watching {args.root} for changes (Ctrl+C to stop)")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        if args.cache:
+            save_parse_cache(args.cache, parse_cache)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the schema build pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser(
+        "build", help="Merge once, then validate, verify and export"
+    )
+    build_parser.add_argument(
+        "--root", "-r", default="dcs-world-schema", help="Schema source directory"
+    )
+    build_parser.add_argument("--dist", "-d", default="dist", help="Output directory")
+    build_parser.add_argument(
+        "--yaml-schema", help="Schema for source YAML validation (dcs_yaml_schema.yaml)"
+    )
+    build_parser.add_argument(
+        "--api-dump", default=DEFAULT_API_DUMP, help="DCS API dump used by verify"
+    )
+    build_parser.add_argument(
+        "--cache", "-c", default=DEFAULT_CACHE, help="Merge parse cache file"
+    )
+    build_parser.add_argument(
+        "--build-cache",
+        default=DEFAULT_BUILD_CACHE,
+        help="Build cache file used to skip unchanged stages",
+    )
+    build_parser.add_argument(
+        "--no-build-cache",
+        dest="build_cache",
+        action="store_const",
+        const=None,
+        help="Run every stage regardless of the build cache",
+    )
+    build_parser.add_argument(
+        "--validate-cache",
+        default=DEFAULT_RESULT_CACHE,
+        help="Source validation result cache file (default: %(default)s); "
+        "unchanged files are not revalidated",
+    )
+    build_parser.add_argument(
+        "--no-validate-cache",
+        dest="validate_cache",
+        action="store_const",
+        const=None,
+        help="Validate every source file regardless of the result cache",
+    )
+    build_parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="Omit generation timestamps so unchanged inputs give identical output",
+    )
+    build_parser.add_argument(
+        "--targets",
+        "-t",
+        nargs="*",
+        choices=list(EXPORTERS),
+        default=list(EXPORTERS),
+        help="Exporters to run (default: all)",
+    )
+    build_parser.add_argument(
+        "--skip",
+        nargs="*",
+        choices=CHECK_STAGES,
+        default=[],
+        help="Validation stages to skip",
+    )
+    build_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Worker processes for parsing, writing and stages (0 = one per CPU)",
+    )
+    build_parser.add_argument(
+        "--hashes",
+        action="store_true",
+        help="Write the Merkle hash sidecar next to the merged JSON",
+    )
+    build_parser.add_argument(
+        "--provenance",
+        action="store_true",
+        help="Write the provenance index next to the merged JSON and use it for "
+        "type checks instead of re-reading the source tree",
+    )
+    build_parser.add_argument(
+        "--snapshot",
+        action="store_true",
+        help="Write the binary schema snapshot next to the merged JSON",
+    )
+    add_compress_argument(build_parser)
+    build_parser.add_argument(
+        "--watch",
+        "-w",
+        action="store_true",
+        help="Rebuild whenever a schema YAML file changes",
+    )
+    build_parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="Seconds between polls in --watch mode (default: 0.5)",
+    )
+    build_parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Verbose output"
+    )
+    args = parser.parse_args()
+    args.jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+
+    if not os.path.isdir(args.root):
+        print(f"✖ Root directory not found: {os.path.abspath(args.root)}")
+        sys.exit(1)
+
+    # Source validation checks the whole tree unless watch mode narrows it
+    args.validate_files = None
+    if args.watch:
+        sys.exit(0 if watch(args) else 1)
+    ok, _ = build(args)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Source provenance of a merged schema.
+
+The provenance index maps the JSON pointer of every merged node to the YAML
+file, line and column it came from, so tools can report where something is
+defined without re-reading the source tree. It is built by
+``merge.py --provenance`` and stored next to the merged JSON as
+``<name>.provenance.json``::
+
+    {"version": 1, "root": "dcs-world-schema",
+     "source": {"size": 418204, "mtime_ns": 1760659200000000000},
+     "files": ["globals/trigger.singleton.yaml", ...],
+     "nodes": {"/globals/trigger": [0, 3, 1], ...},
+     "entries": {"/globals/trigger": [0, 7], ...}}
+
+Each node holds ``[file index, line, column]`` with 1-based line and column.
+Mappings and list items point at the file that first defined them; scalars at
+the file whose value won the merge. ``entries`` lists every file that defines
+or extends each global and type, in merge order. ``source`` records the size and mtime of
+the merged JSON when the index was written, so a stale index is never used.
+"""
+
+import json
+import os
+
+from build_cache import matches_source
+
+# Bump whenever the index layout changes so old sidecars are not used.
+PROVENANCE_VERSION = 2
+
+
+def escape_token(token):
+    """Escape one JSON pointer reference token (RFC 6901)."""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def unescape_token(token):
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def split_pointer(pointer):
+    """Split a JSON pointer into its unescaped reference tokens."""
+    return [unescape_token(t) for t in pointer.split("/")[1:]]
+
+
+def new_provenance(root):
+    return {
+        "version": PROVENANCE_VERSION,
+        "root": root,
+        "files": [],
+        "nodes": {},
+        "entries": {},
+    }
+
+
+def provenance_path(output_path):
+    """Sidecar path for a merged output: ``schema.json`` -> ``schema.provenance.json``."""
+    return f"{os.path.splitext(output_path)[0]}.provenance.json"
+
+
+def dumps_provenance(provenance):
+    return json.dumps(provenance, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_provenance(path):
+    """Load a provenance sidecar, or None if it is missing or from another version."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            provenance = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        not isinstance(provenance, dict)
+        or provenance.get("version") != PROVENANCE_VERSION
+    ):
+        return None
+    return provenance
+
+
+def load_fresh_provenance(schema_path):
+    """Load the sidecar of a merged schema if it was written for its current content."""
+    provenance = load_provenance(provenance_path(schema_path))
+    if provenance is None or not matches_source(provenance.get("source"), schema_path):
+        return None
+    return provenance
+
+
+def locate(provenance, pointer):
+    """Return ``(file, line, column)`` for a JSON pointer, or None if unknown."""
+    node = provenance["nodes"].get(pointer)
+    if node is None:
+        return None
+    file_index, line, column = node
+    return provenance["files"][file_index], line, column
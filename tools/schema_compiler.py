@@ -0,0 +1,425 @@
+"""
+Compile dcs_yaml_schema.yaml into a specialized Python validation module.
+
+The interpreted jsonschema validators walk ``$ref``, ``oneOf`` and
+``additionalProperties`` generically for every entry. ``compile_schema`` instead
+generates one generator function per definition (``globalEntry``,
+``typeEntry``, ``methodDef``, ``fieldDef``, ``paramDef``, ...) with the checks
+of every inline subschema inlined into it, and reports errors with the same
+path, message and keyword as jsonschema's Draft 7 validator.
+
+``load_compiled`` caches the generated module under ``.cache/validators``,
+keyed by the SHA-256 of the schema file and of this compiler, so it is only
+regenerated when either changes. Schemas using keywords the compiler does not
+support raise UnsupportedSchema; callers fall back to jsonschema then.
+"""
+
+import glob
+import hashlib
+import importlib.util
+import os
+import re
+import types
+
+# Bump whenever the generated code changes so cached modules are regenerated.
+COMPILER_VERSION = 1
+DEFAULT_CACHE_DIR = os.path.join(".cache", "validators")
+
+# Keywords Draft 7 ignores for validation
+ANNOTATIONS = {
+    "$schema",
+    "$id",
+    "$comment",
+    "title",
+    "description",
+    "default",
+    "examples",
+    "definitions",
+    "readOnly",
+    "writeOnly",
+}
+OBJECT_KEYWORDS = ("properties", "required", "additionalProperties", "minProperties")
+SUPPORTED = {"$ref", "type", "enum", "const", "oneOf", "items", *OBJECT_KEYWORDS}
+TYPE_CHECKS = {
+    "object": "isinstance({0}, dict)",
+    "array": "isinstance({0}, list)",
+    "string": "isinstance({0}, str)",
+    "boolean": "isinstance({0}, bool)",
+    "number": "(isinstance({0}, Number) and not isinstance({0}, bool))",
+    "integer": "_is_integer({0})",
+    "null": "{0} is None",
+}
+
+HEADER = '''\
+# Generated by schema_compiler.py from {source} (sha256 {digest}).
+# Do not edit: it is regenerated whenever the schema or the compiler changes.
+from numbers import Number
+
+COMPILER_VERSION = {version}
+DIGEST = {digest!r}
+
+
+class ValidationError:
+    __slots__ = ("path", "message", "validator", "instance")
+
+    def __init__(self, path, message, validator, instance):
+        self.path = path
+        self.message = message
+        self.validator = validator
+        self.instance = instance
+
+    def __repr__(self):
+        return f"<ValidationError: {{self.message!r}}>"
+
+
+class Validator:
+    """The iter_errors/is_valid subset of a jsonschema validator."""
+
+    __slots__ = ("_check",)
+
+    def __init__(self, check):
+        self._check = check
+
+    def iter_errors(self, instance):
+        return self._check(instance, ())
+
+    def is_valid(self, instance):
+        return next(self._check(instance, ()), None) is None
+
+
+def _is_valid(check, instance):
+    return next(check(instance, ()), None) is None
+
+
+def _is_integer(instance):
+    if isinstance(instance, bool):
+        return False
+    if isinstance(instance, float):
+        return instance.is_integer()
+    return isinstance(instance, int)
+
+
+def _extras(extras):
+    extras = sorted(extras, key=str)
+    joined = ", ".join(repr(extra) for extra in extras)
+    verb = "was" if len(extras) == 1 else "were"
+    return f"Additional properties are not allowed ({{joined}} {{verb}} unexpected)"
+'''
+
+
+class UnsupportedSchema(ValueError):
+    """The schema uses a keyword or form the compiler cannot generate code for."""
+
+
+def _path(path):
+    """Render a ``(base variable, [element expressions])`` path as an expression."""
+    base, parts = path
+    return f"{base} + ({', '.join(parts)},)" if parts else base
+
+
+def _child(path, part):
+    return path[0], [*path[1], part]
+
+
+def _is_trivial(node):
+    return node is True or (isinstance(node, dict) and set(node) <= ANNOTATIONS)
+
+
+class _Compiler:
+    def __init__(self, schema):
+        self.root = schema
+        self.names = {}  # id(schema node) -> function name
+        self.nodes = []  # (name, node) in the order functions were requested
+        self.constants = []
+        self.counter = 0
+
+    def fresh(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def constant(self, expr):
+        name = self.fresh("_K")
+        self.constants.append(f"{name} = {expr}")
+        return name
+
+    def function(self, node, hint=None):
+        if id(node) not in self.names:
+            name = "_" + re.sub(r"\W", "_", hint) if hint else self.fresh("_schema")
+            if name in self.names.values():
+                name = self.fresh(f"{name}_")
+            self.names[id(node)] = name
+            self.nodes.append((name, node))
+        return self.names[id(node)]
+
+    def resolve(self, ref):
+        """Function name for a local ``$ref``."""
+        if not ref.startswith("#"):
+            raise UnsupportedSchema(f"remote $ref {ref!r}")
+        node, tokens = self.root, ref[1:].split("/")[1:]
+        for token in tokens:
+            token = token.replace("~1", "/").replace("~0", "~")
+            if not isinstance(node, dict) or token not in node:
+                raise UnsupportedSchema(f"unresolvable $ref {ref!r}")
+            node = node[token]
+        return self.function(node, tokens[-1] if tokens else "root")
+
+    def branch(self, node):
+        """Function name for a subschema that is checked on its own (oneOf)."""
+        if isinstance(node, dict) and "$ref" in node:
+            return self.resolve(node["$ref"])
+        return self.function(node)
+
+    def error(self, pad, path, message, keyword, inst):
+        return f"{pad}yield _Error({_path(path)}, {message}, {keyword!r}, {inst})"
+
+    def emit(self, node, inst, path, depth):
+        """Lines checking inst (a variable name) against node at the given depth."""
+        if _is_trivial(node):
+            return []
+        if not isinstance(node, dict):
+            raise UnsupportedSchema(f"schema {node!r}")
+        pad = "    " * depth
+        if "$ref" in node:
+            # Draft 7 ignores every keyword next to $ref
+            return [
+                f"{pad}yield from {self.resolve(node['$ref'])}({inst}, {_path(path)})"
+            ]
+        unknown = set(node) - SUPPORTED - ANNOTATIONS
+        if unknown:
+            raise UnsupportedSchema(f"keyword(s) {', '.join(sorted(unknown))}")
+
+        lines = []
+        for key, value in node.items():
+            if key == "type":
+                kinds = [value] if isinstance(value, str) else value
+                if any(kind not in TYPE_CHECKS for kind in kinds):
+                    raise UnsupportedSchema(f"type {value!r}")
+                check = " or ".join(TYPE_CHECKS[kind].format(inst) for kind in kinds)
+                suffix = " is not of type " + ", ".join(repr(kind) for kind in kinds)
+                lines.append(f"{pad}if not ({check}):")
+                lines.append(
+                    self.error(
+                        pad + "    ", path, f"repr({inst}) + {suffix!r}", key, inst
+                    )
+                )
+            elif key == "enum":
+                if not all(isinstance(each, str) for each in value):
+                    raise UnsupportedSchema("enum with non-string values")
+                allowed = self.constant(f"frozenset({value!r})")
+                suffix = f" is not one of {value!r}"
+                lines.append(
+                    f"{pad}if not (isinstance({inst}, str) and {inst} in {allowed}):"
+                )
+                lines.append(
+                    self.error(
+                        pad + "    ", path, f"repr({inst}) + {suffix!r}", key, inst
+                    )
+                )
+            elif key == "const":
+                if not isinstance(value, str):
+                    raise UnsupportedSchema("const with a non-string value")
+                lines.append(
+                    f"{pad}if not (isinstance({inst}, str) and {inst} == {value!r}):"
+                )
+                lines.append(
+                    self.error(
+                        pad + "    ", path, repr(f"{value!r} was expected"), key, inst
+                    )
+                )
+            elif key == "oneOf":
+                lines += self.emit_one_of(value, inst, path, pad)
+
+        # With only a type check before it, a dict/list block is its else branch
+        guard = (
+            node.get("type")
+            if not {"enum", "const", "oneOf"} & set(node)
+            and isinstance(node.get("type"), str)
+            else None
+        )
+        body = []
+        for key in OBJECT_KEYWORDS:
+            if key in node:
+                body += self.emit_object_keyword(node, key, inst, path, depth + 1)
+        if body:
+            if guard == "object":
+                lines.append(f"{pad}else:")
+            else:
+                lines.append(f"{pad}if isinstance({inst}, dict):")
+            lines += body
+
+        items = node.get("items")
+        if items is not None and not _is_trivial(items):
+            if not isinstance(items, dict):
+                raise UnsupportedSchema("items as a list of schemas")
+            index, item = self.fresh("n"), self.fresh("v")
+            if guard == "array" and not body:
+                lines.append(f"{pad}else:")
+            else:
+                lines.append(f"{pad}if isinstance({inst}, list):")
+            lines.append(f"{pad}    for {index}, {item} in enumerate({inst}):")
+            lines += self.emit(items, item, _child(path, index), depth + 2)
+        return lines
+
+    def emit_one_of(self, branches, inst, path, pad):
+        checks = ", ".join(self.branch(branch) for branch in branches)
+        reprs = self.constant(repr(tuple(repr(branch) for branch in branches)))
+        valid = self.fresh("_valid")
+        none = repr(" is not valid under any of the given schemas")
+        # Like jsonschema: later valid branches are listed first, then the first
+        each = (
+            f"repr({inst}) + ' is valid under each of ' + ', '.join("
+            f"{reprs}[n] for n in {valid}[1:] + {valid}[:1])"
+        )
+        return [
+            (
+                f"{pad}{valid} = [n for n, check in enumerate(({checks},)) "
+                f"if _is_valid(check, {inst})]"
+            ),
+            f"{pad}if not {valid}:",
+            self.error(pad + "    ", path, f"repr({inst}) + {none}", "oneOf", inst),
+            f"{pad}elif len({valid}) > 1:",
+            self.error(pad + "    ", path, each, "oneOf", inst),
+        ]
+
+    def emit_object_keyword(self, node, key, inst, path, depth):
+        pad = "    " * depth
+        value = node[key]
+        lines = []
+        if key == "properties":
+            for name, subschema in value.items():
+                if _is_trivial(subschema):
+                    continue
+                item = self.fresh("v")
+                lines.append(f"{pad}if {name!r} in {inst}:")
+                lines.append(f"{pad}    {item} = {inst}[{name!r}]")
+                lines += self.emit(subschema, item, _child(path, repr(name)), depth + 1)
+        elif key == "required":
+            for name in value:
+                lines.append(f"{pad}if {name!r} not in {inst}:")
+                message = repr(f"{name!r} is a required property")
+                lines.append(self.error(pad + "    ", path, message, key, inst))
+        elif key == "additionalProperties":
+            if "patternProperties" in node:
+                raise UnsupportedSchema("patternProperties")
+            known = node.get("properties") and self.constant(
+                f"frozenset({sorted(node['properties'])!r})"
+            )
+            if value is False:
+                extras = self.fresh("extras")
+                if known:
+                    lines.append(
+                        f"{pad}{extras} = [k for k in {inst} if k not in {known}]"
+                    )
+                else:
+                    lines.append(f"{pad}{extras} = list({inst})")
+                lines.append(f"{pad}if {extras}:")
+                lines.append(
+                    self.error(pad + "    ", path, f"_extras({extras})", key, inst)
+                )
+            elif not _is_trivial(value):
+                name, item = self.fresh("k"), self.fresh("v")
+                lines.append(f"{pad}for {name}, {item} in {inst}.items():")
+                if node.get("properties"):
+                    lines.append(f"{pad}    if {name} not in {known}:")
+                    depth += 1
+                lines += self.emit(value, item, _child(path, name), depth + 1)
+        elif key == "minProperties":
+            suffix = (
+                " should be non-empty"
+                if value == 1
+                else " does not have enough properties"
+            )
+            lines.append(f"{pad}if len({inst}) < {value!r}:")
+            lines.append(
+                self.error(pad + "    ", path, f"repr({inst}) + {suffix!r}", key, inst)
+            )
+        return lines
+
+    def compile(self, source, digest):
+        root = self.function(self.root, "root")
+        definitions = (
+            self.root.get("definitions", {}) if isinstance(self.root, dict) else {}
+        )
+        for name, node in definitions.items():
+            self.function(node, name)
+
+        functions, done = [], 0
+        while done < len(self.nodes):
+            name, node = self.nodes[done]
+            done += 1
+            body = self.emit(node, "i", ("p", []), 1) or ["    return", "    yield"]
+            functions.append("\n".join([f"def {name}(i, p):", *body]))
+
+        table = ",\n".join(
+            f"    {name!r}: Validator({self.names[id(node)]})"
+            for name, node in definitions.items()
+        )
+        parts = [
+            HEADER.format(source=source, digest=digest, version=COMPILER_VERSION),
+            "\n_Error = ValidationError\n",
+            "\n".join(self.constants),
+            *functions,
+            f"root = Validator({root})\ndefinitions = {{\n{table},\n}}\n"
+            if table
+            else f"root = Validator({root})\ndefinitions = {{}}\n",
+        ]
+        return "\n\n".join(part for part in parts if part)
+
+
+def compile_schema(schema, source="schema", digest=""):
+    """Return the source of a validation module for a loaded Draft 7 schema."""
+    return _Compiler(schema).compile(source, digest)
+
+
+def schema_digest(schema_path):
+    """Digest of the schema file and of this compiler."""
+    digest = hashlib.sha256()
+    with open(schema_path, "rb") as f:
+        digest.update(f.read())
+    with open(__file__, "rb") as f:
+        digest.update(f.read())
+    digest.update(str(COMPILER_VERSION).encode())
+    return digest.hexdigest()
+
+
+def _import(path, module_name):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_compiled(schema_path, load_schema, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Return the compiled validation module for schema_path.
+
+    load_schema(schema_path) is only called when the cached module is missing
+    or stale. The module exposes ``root`` and ``definitions`` validators with
+    jsonschema's iter_errors/is_valid interface. If the cache directory is not
+    writable the module is compiled in memory.
+    """
+    digest = schema_digest(schema_path)
+    stem = re.sub(r"\W", "_", os.path.splitext(os.path.basename(schema_path))[0])
+    module_name = f"{stem}_{digest[:16]}"
+    path = os.path.join(cache_dir, f"{module_name}.py")
+    if os.path.exists(path):
+        return _import(path, module_name)
+
+    source = compile_schema(
+        load_schema(schema_path), os.path.basename(schema_path), digest
+    )
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(source)
+        os.replace(tmp_path, path)
+        for stale in glob.glob(os.path.join(cache_dir, f"{stem}_*.py")):
+            if stale != path:
+                os.remove(stale)
+    except OSError:
+        module = types.ModuleType(module_name)
+        # Generated from the schema by compile_schema, never from user input
+        exec(compile(source, path, "exec"), module.__dict__)  # noqa: S102
+        return module
+    return _import(path, module_name)
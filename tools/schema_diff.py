@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Report semantic differences between two merged schema builds.
+Usage: python schema_diff.py <old_schema.json> <new_schema.json> [--json] [--output <file>]
+
+Lists added, removed and changed globals, types, members, fields, enum values
+and params. Both schemas are compared through their Merkle hashes (see
+schema_hash.py), so identical subtrees are skipped without being walked. A
+fresh <name>.hashes.json sidecar written by `merge.py --hashes` is used when
+present; otherwise the hashes are computed here.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from build_cache import matches_source
+from schema_hash import hash_schema, hashes_path, load_hashes, split_entry
+from snapshot import load_schema
+
+# Child key prefix -> kind of schema element it names
+CHILD_KINDS = {
+    "instance": "member",
+    "static": "member",
+    "properties": "member",
+    "fields": "field",
+    "values": "enum value",
+    "params": "param",
+}
+TOP_KINDS = {"globals": "global", "types": "type"}
+
+
+def load_tree(schema, schema_path):
+    """Use the hash sidecar if it was written for the schema's content, else hash now."""
+    tree = load_hashes(hashes_path(schema_path))
+    if tree is None or not matches_source(tree.get("source"), schema_path):
+        return hash_schema(schema)
+    return tree
+
+
+def _kind(path):
+    if len(path) == 2:
+        return TOP_KINDS.get(path[0], "entry")
+    if len(path) == 1:
+        return "section"
+    # Positional params are keyed params#<index>
+    return CHILD_KINDS.get(re.split(r"[.#]", path[-1], maxsplit=1)[0], "entry")
+
+
+def _own_changes(old, new):
+    """Keys of an entry's own fields (not its children) that differ."""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return None
+    old_own, new_own = split_entry(old)[0], split_entry(new)[0]
+    return sorted(
+        key
+        for key in set(old_own) | set(new_own)
+        if old_own.get(key) != new_own.get(key)
+    )
+
+
+def _children(value, path):
+    """Child values of a node, keyed like its hash tree children."""
+    if not path:
+        return value
+    if len(path) == 1:
+        return value if isinstance(value, dict) else {}
+    return split_entry(value)[1] if isinstance(value, dict) else {}
+
+
+def diff_trees(old_tree, new_tree, old, new, path=()):
+    """
+    Yield change records for two schema nodes and their Merkle hash nodes.
+
+    Subtrees with equal hashes are pruned, so the work done is proportional to
+    the size of the change rather than the size of the schema.
+    """
+    if old_tree["hash"] == new_tree["hash"]:
+        return
+    old_kids, new_kids = old_tree.get("children"), new_tree.get("children")
+    # Entries without children are hashed as leaves, so an entry that gains its
+    # first child (or loses its last) has children on one side only
+    one_sided = old_kids is None or new_kids is None
+    if one_sided and not (
+        len(path) >= 2 and isinstance(old, dict) and isinstance(new, dict)
+    ):
+        yield {
+            "change": "changed",
+            "kind": _kind(path),
+            "path": list(path),
+            "old": old,
+            "new": new,
+        }
+        return
+    old_kids = {} if old_kids is None else old_kids
+    new_kids = {} if new_kids is None else new_kids
+
+    if len(path) >= 2:  # sections only hold children, entries have own fields
+        keys = _own_changes(old, new)
+        if keys:
+            yield {
+                "change": "changed",
+                "kind": _kind(path),
+                "path": list(path),
+                "keys": keys,
+            }
+    old_values, new_values = _children(old, path), _children(new, path)
+    for key in old_kids:
+        if key not in new_kids:
+            child = path + (key,)
+            yield {"change": "removed", "kind": _kind(child), "path": list(child)}
+    for key, new_child in new_kids.items():
+        child = path + (key,)
+        if key not in old_kids:
+            yield {"change": "added", "kind": _kind(child), "path": list(child)}
+            continue
+        yield from diff_trees(
+            old_kids[key],
+            new_child,
+            old_values.get(key),
+            new_values.get(key),
+            child,
+        )
+
+
+def diff_schemas(old, new, old_tree=None, new_tree=None):
+    """Return the list of change records between two merged schemas."""
+    old_tree = old_tree or hash_schema(old)
+    new_tree = new_tree or hash_schema(new)
+    return list(diff_trees(old_tree, new_tree, old, new))
+
+
+def format_change(change):
+    symbol = {"added": "+", "removed": "-", "changed": "~"}[change["change"]]
+    line = f"{symbol} {change['kind']:<10} {'/'.join(change['path'])}"
+    if "keys" in change:
+        line += f" ({', '.join(change['keys'])})"
+    elif "old" in change:
+        line += f": {json.dumps(change['old'], ensure_ascii=False)} -> "
+        line += json.dumps(change["new"], ensure_ascii=False)
+    return line
+
+
+def summarize(changes):
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    for change in changes:
+        counts[change["change"]] += 1
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Report semantic differences between two merged schemas."
+    )
+    parser.add_argument("old", help="Old merged schema (dcs-world-api-schema.json)")
+    parser.add_argument("new", help="New merged schema (dcs-world-api-schema.json)")
+    parser.add_argument(
+        "--json", action="store_true", help="Print the changes as JSON instead of text"
+    )
+    parser.add_argument("--output", "-o", help="Write the report to a file")
+    args = parser.parse_args()
+
+    try:
+        old, new = load_schema(args.old), load_schema(args.new)
+    except (OSError, ValueError) as e:
+        print(f"✖ Error loading schema: {e}")
+        sys.exit(1)
+
+    changes = diff_schemas(old, new, load_tree(old, args.old), load_tree(new, args.new))
+    counts = summarize(changes)
+    if args.json:
+        report = json.dumps(
+            {"old": args.old, "new": args.new, "summary": counts, "changes": changes},
+            indent=2,
+            ensure_ascii=False,
+        )
+    else:
+        lines = [f"Schema diff: {args.old} -> {args.new}"]
+        lines += [format_change(change) for change in changes]
+        lines.append(
+            f"{counts['added']} added, {counts['removed']} removed, "
+            f"{counts['changed']} changed"
+        )
+        report = "\n".join(lines)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report + "\n")
+        print(f"✅ Schema diff written to {args.output}")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Merkle hashes of a merged schema.
+
+Every global, type, member, field, enum value and param gets a content hash,
+and each parent's hash is computed from its own fields plus its children's
+hashes. Two builds can then be compared top-down: a subtree whose hash matches
+is identical and never has to be walked.
+
+A node is ``{"hash": <hex>, "children": {<key>: <node>}}``; leaves have no
+``children``. Child keys are ``<section>.<name>`` for members (``static.getTime``,
+``fields.x``, ``values.RED``) and ``params.<name>`` for params, so they can be
+read back as a path through the schema. Params without a usable name are keyed
+by position as ``params#<index>``, which no name can collide with.
+"""
+
+import hashlib
+import json
+import os
+
+# Bump whenever the hashing scheme changes so old sidecars are not compared.
+HASH_VERSION = 2
+
+# Mapping sections whose entries are hashed as separate children
+CHILD_SECTIONS = ("instance", "static", "properties", "fields", "values")
+# Top-level sections whose entries are hashed as separate children
+TOP_SECTIONS = ("globals", "types")
+
+
+def _digest(*parts):
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+
+def _leaf(value):
+    return {"hash": _digest("leaf", _canonical(value))}
+
+
+def _node(own, children):
+    # Children are combined in insertion order: sorted names for mappings and
+    # list order for params, so reordering params changes the parent's hash.
+    parts = [own]
+    for key, child in children.items():
+        parts += (key, child["hash"])
+    return {"hash": _digest("node", *parts), "children": children}
+
+
+def split_entry(entry):
+    """
+    Split an entry into its own fields and its children, keyed as in the tree.
+
+    Members, fields and enum values become ``<section>.<name>`` children and
+    params become ``params.<name>`` (``params#<index>`` if unnamed or repeated).
+    The own fields keep the param keys in order under ``params``.
+    """
+    own, children = {}, {}
+    for key, value in entry.items():
+        if key in CHILD_SECTIONS and isinstance(value, dict):
+            for name in sorted(value, key=str):
+                children[f"{key}.{name}"] = value[name]
+        elif key == "params" and isinstance(value, list):
+            param_keys = []
+            for i, param in enumerate(value):
+                name = param.get("name") if isinstance(param, dict) else None
+                child_key = f"params.{name}"
+                if name is None or child_key in children:
+                    child_key = f"params#{i}"
+                children[child_key] = param
+                param_keys.append(child_key)
+            own["params"] = param_keys
+        else:
+            own[key] = value
+    return own, children
+
+
+def hash_entry(entry):
+    """Hash one global, type or member together with its nested members and params."""
+    if not isinstance(entry, dict):
+        return _leaf(entry)
+    own, children = split_entry(entry)
+    if not children:
+        return _leaf(entry)
+    hashed = {key: hash_entry(value) for key, value in children.items()}
+    return _node(_canonical(own), hashed)
+
+
+def hash_schema(schema):
+    """
+    Build the Merkle tree of a merged schema.
+
+    The schema should have string keys, as loaded from the merged JSON (see
+    ``merge.json_normalize``). Mapping key order does not affect any hash.
+    """
+    children = {}
+    for key in sorted(schema):
+        value = schema[key]
+        if key in TOP_SECTIONS and isinstance(value, dict):
+            section = {name: hash_entry(value[name]) for name in sorted(value)}
+            children[key] = _node("", section)
+        else:
+            children[key] = _leaf(value)
+    tree = _node("", children)
+    tree["version"] = HASH_VERSION
+    return tree
+
+
+def hashes_path(output_path):
+    """Sidecar path for a merged output: ``schema.json`` -> ``schema.hashes.json``."""
+    return f"{os.path.splitext(output_path)[0]}.hashes.json"
+
+
+def dumps_hashes(tree):
+    return json.dumps(tree, ensure_ascii=False, separators=(",", ":"))
+
+
+def load_hashes(path):
+    """Load a hash sidecar, or None if it is missing or from another version."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            tree = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(tree, dict) or tree.get("version") != HASH_VERSION:
+        return None
+    return tree
@@ -0,0 +1,300 @@
+"""
+Alternative on-disk layouts of the merged schema and their loaders.
+
+Sharded layout (``merge.py --shards <dir>``): one JSON file per global and per
+type, plus ``manifest.json`` listing every shard with its Merkle hash (see
+schema_hash.py) and the shards it references::
+
+    {"version": 1, "hash": "<schema hash>", "sections": ["globals", "types", ...],
+     "shards": {"globals/trigger": {"file": "globals/trigger.json",
+                                    "hash": "...", "deps": ["types/Vec3", ...]}}}
+
+Consumers that only need a few namespaces load them and their dependency
+closure with ``load_shards`` instead of the whole merged JSON.
+
+Byte-offset index (``merge.py --index``): a ``<name>.index.json`` sidecar
+mapping every top-level section and every ``globals``/``types`` entry to its
+``[start, end)`` byte range in the merged JSON::
+
+    {"version": 2, "size": <bytes>, "sections": {"globals": [10, 200], ...},
+     "globals": {"trigger": [25, 900], ...}, "types": {...},
+     "source": {"size": <bytes>, "mtime_ns": ..., "sha256": "..."}}
+
+``source`` identifies the JSON file the offsets were computed for; an index
+whose JSON has since been rewritten is rejected rather than misread. Loading
+checks the size and mtime only; the JSON is hashed just when its mtime has
+changed, or on request with ``verify=True``.
+
+``IndexedSchema`` memory-maps the JSON and decodes entries only when they are
+accessed; ``load_entry`` seeks to and decodes a single entry.
+"""
+
+import json
+import mmap
+import os
+from collections.abc import Mapping
+from urllib.parse import quote
+
+from build_cache import sha256_file, source_stamp, write_text_if_changed
+from schema_hash import hash_schema
+from validate_types import collect_refs
+
+# Bump whenever the shard layout changes so readers can reject it.
+SHARD_VERSION = 1
+MANIFEST = "manifest.json"
+SHARDED_SECTIONS = ("globals", "types")
+_MISSING = object()
+
+INDEX_VERSION = 2
+INDEXED_SECTIONS = ("globals", "types")
+
+
+def _shard_file(key):
+    section, _, name = key.partition("/")
+    # Keep names readable but never let them escape the shard directory
+    name = quote(name, safe="._-") if name else ""
+    return f"{section}/{name}.json" if name else f"{section}.json"
+
+
+def shard_schema(schema):
+    """
+    Split a JSON-normalized merged schema into ``(manifest, shards)``.
+
+    shards maps each shard key (``globals/<name>``, ``types/<name>``, or the
+    name of any other top-level section) to its content.
+    """
+    tree = hash_schema(schema)
+    children = tree["children"]
+    shards = {}
+    manifest = {
+        "version": SHARD_VERSION,
+        "hash": tree["hash"],
+        "sections": list(schema),
+        "shards": {},
+    }
+    for section, value in schema.items():
+        if section in SHARDED_SECTIONS and isinstance(value, dict):
+            for name, entry in value.items():
+                key = f"{section}/{name}"
+                shards[key] = entry
+                manifest["shards"][key] = {
+                    "file": _shard_file(key),
+                    "hash": children[section]["children"][name]["hash"],
+                }
+        else:
+            shards[section] = value
+            manifest["shards"][section] = {
+                "file": _shard_file(section),
+                "hash": children[section]["hash"],
+            }
+
+    # Dependency edges: every type name a shard references that has a shard
+    names = {}
+    for section in SHARDED_SECTIONS:
+        if isinstance(schema.get(section), dict):
+            for name in schema[section]:
+                names.setdefault(name, f"{section}/{name}")
+    for key, info in manifest["shards"].items():
+        refs = collect_refs(shards[key]) if "/" in key else {}
+        info["deps"] = sorted(
+            {names[ref] for ref in refs if ref in names and names[ref] != key}
+        )
+    return manifest, shards
+
+
+def write_shards(schema, shard_dir):
+    """
+    Write a sharded copy of a JSON-normalized schema to shard_dir.
+
+    Unchanged shards are left untouched, and shards listed in the previous
+    manifest whose namespace no longer exists are deleted. Returns the number
+    of shard files that were (re)written.
+    """
+    manifest, shards = shard_schema(schema)
+    try:
+        previous = load_manifest(shard_dir)["shards"]
+    except (OSError, ValueError):
+        previous = {}
+    written = 0
+    for key, info in manifest["shards"].items():
+        text = json.dumps(shards[key], indent=2, ensure_ascii=False)
+        written += write_text_if_changed(os.path.join(shard_dir, info["file"]), text)
+    current = {info["file"] for info in manifest["shards"].values()}
+    for info in previous.values():
+        if info["file"] not in current:
+            try:
+                os.remove(os.path.join(shard_dir, info["file"]))
+            except FileNotFoundError:
+                pass
+    write_text_if_changed(
+        os.path.join(shard_dir, MANIFEST), json.dumps(manifest, indent=2)
+    )
+    return written
+
+
+def load_manifest(shard_dir):
+    with open(os.path.join(shard_dir, MANIFEST), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("version") != SHARD_VERSION:
+        raise ValueError(
+            f"unsupported shard layout version {manifest.get('version')!r} in {shard_dir}"
+        )
+    return manifest
+
+
+def closure(manifest, keys):
+    """Return the given shard keys plus every shard they transitively depend on."""
+    shards = manifest["shards"]
+    missing = [key for key in keys if key not in shards]
+    if missing:
+        raise KeyError(f"unknown shard(s): {', '.join(missing)}")
+    seen, stack = set(), list(keys)
+    while stack:
+        key = stack.pop()
+        if key not in seen:
+            seen.add(key)
+            stack.extend(shards[key]["deps"])
+    return seen
+
+
+def load_shards(shard_dir, keys=None):
+    """
+    Load a schema from a shard directory.
+
+    With keys (e.g. ``["globals/trigger"]``), only those shards and their
+    dependency closure are read; the result has the same layout as the merged
+    JSON, restricted to the loaded namespaces. Without keys, everything is
+    loaded, in manifest order.
+    """
+    manifest = load_manifest(shard_dir)
+    wanted = closure(manifest, keys) if keys is not None else None
+    # Seed every section so the merged JSON's key order is kept
+    schema = {
+        s: {} if s in SHARDED_SECTIONS else _MISSING for s in manifest["sections"]
+    }
+    for key, info in manifest["shards"].items():
+        if wanted is not None and key not in wanted:
+            continue
+        with open(os.path.join(shard_dir, info["file"]), "r", encoding="utf-8") as f:
+            value = json.load(f)
+        section, _, name = key.partition("/")
+        if name:
+            schema.setdefault(section, {})[name] = value
+        else:
+            schema[section] = value
+    return {
+        section: value for section, value in schema.items() if value is not _MISSING
+    }
+
+
+def index_path(output_path):
+    """Sidecar path for a merged JSON: ``schema.json`` -> ``schema.index.json``."""
+    return f"{os.path.splitext(output_path)[0]}.index.json"
+
+
+def index_stamp(json_path):
+    """The ``source`` entry of an index written for json_path as it is now."""
+    return {**source_stamp(json_path), "sha256": sha256_file(json_path)}
+
+
+def load_index(json_path, path=None, verify=False):
+    """
+    Load the byte-offset index of a merged JSON file.
+
+    Raises ValueError if the index is from another layout version or does not
+    match the JSON file, i.e. it was written for another build. A JSON file
+    with the recorded size and mtime is trusted without being read; with
+    verify, or if only the mtime differs, its digest must match too.
+    """
+    path = path or index_path(json_path)
+    with open(path, "r", encoding="utf-8") as f:
+        index = json.load(f)
+    if index.get("version") != INDEX_VERSION:
+        raise ValueError(
+            f"unsupported index version {index.get('version')!r} in {path}"
+        )
+    source = index.get("source")
+    source = source if isinstance(source, dict) else {}
+    st = os.stat(json_path)
+    stale = index.get("size") != st.st_size or source.get("size") != st.st_size
+    if not stale and (verify or source.get("mtime_ns") != st.st_mtime_ns):
+        # The digest settles a changed mtime, e.g. of a copied or touched file
+        stale = source.get("sha256") != sha256_file(json_path)
+    if stale:
+        raise ValueError(f"index {path} is stale for {json_path}")
+    return index
+
+
+def load_entry(json_path, section, name, index=None):
+    """Decode a single globals/types entry by seeking to its byte range."""
+    index = index or load_index(json_path)
+    start, end = index[section][name]
+    with open(json_path, "rb") as f:
+        f.seek(start)
+        return json.loads(f.read(end - start).decode("utf-8"))
+
+
+class _LazySection(Mapping):
+    """A globals/types section whose entries are decoded on first access."""
+
+    def __init__(self, schema, ranges):
+        self._schema = schema
+        self._ranges = ranges
+        self._decoded = {}
+
+    def __getitem__(self, name):
+        if name not in self._decoded:
+            start, end = self._ranges[name]
+            self._decoded[name] = self._schema._decode(start, end)
+        return self._decoded[name]
+
+    def __iter__(self):
+        return iter(self._ranges)
+
+    def __len__(self):
+        return len(self._ranges)
+
+
+class IndexedSchema(Mapping):
+    """
+    Read-only view of a merged JSON file backed by its byte-offset index.
+
+    The file is memory-mapped and nothing is decoded up front: ``schema["types"]
+    ["Vec3"]`` decodes just that entry, and other sections are decoded whole on
+    first access. Use as a context manager, or call close(), to release the map.
+    """
+
+    def __init__(self, json_path, index_path=None, verify=False):
+        self._index = load_index(json_path, index_path, verify)
+        self._file = open(json_path, "rb")  # noqa: SIM115 - closed by close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._sections = {}
+
+    def _decode(self, start, end):
+        return json.loads(self._map[start:end].decode("utf-8"))
+
+    def __getitem__(self, section):
+        if section not in self._sections:
+            if section in INDEXED_SECTIONS and section in self._index:
+                value = _LazySection(self, self._index[section])
+            else:
+                start, end = self._index["sections"][section]
+                value = self._decode(start, end)
+            self._sections[section] = value
+        return self._sections[section]
+
+    def __iter__(self):
+        return iter(self._index["sections"])
+
+    def __len__(self):
+        return len(self._index["sections"])
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
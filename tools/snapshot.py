@@ -0,0 +1,114 @@
+"""
+Binary snapshot of the merged schema for fast tool startup.
+
+``merge.py --snapshot`` writes ``<name>.snapshot`` next to the merged JSON. The
+file is a small header followed by a pickled copy of the schema::
+
+    b"DCSSNAP\\n" | header length (4 bytes, big-endian) | JSON header | payload
+
+The header records the snapshot version, the size and mtime of the JSON file it
+was taken from and the SHA-256 of the payload. ``load_schema`` uses the
+snapshot only when it still matches the JSON file and its payload is intact,
+and falls back to ``json.load`` otherwise, so a stale or damaged snapshot is
+never worse than not having one.
+
+Snapshots are a local build artifact: only load snapshots you built yourself.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import struct
+
+from compressed import codec_of, open_text
+from interned import expand, is_interned
+
+MAGIC = b"DCSSNAP\n"
+# Bump whenever the container layout changes so old snapshots are ignored.
+SNAPSHOT_VERSION = 1
+_LENGTH = struct.Struct(">I")
+
+
+def snapshot_path(json_path):
+    """Snapshot path for a merged JSON: ``schema.json`` -> ``schema.snapshot``."""
+    return f"{os.path.splitext(json_path)[0]}.snapshot"
+
+
+def write_snapshot(schema, json_path, path=None):
+    """
+    Snapshot a JSON-normalized schema that was just written to json_path.
+
+    Returns True if the snapshot file was (re)written.
+    """
+    path = path or snapshot_path(json_path)
+    payload = pickle.dumps(schema, protocol=pickle.HIGHEST_PROTOCOL)
+    st = os.stat(json_path)
+    header = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "source_size": st.st_size,
+            "source_mtime_ns": st.st_mtime_ns,
+            "sha256": hashlib.sha256(payload).hexdigest(),
+        },
+        sort_keys=True,
+    ).encode("utf-8")
+    data = MAGIC + _LENGTH.pack(len(header)) + header + payload
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return True
+
+
+def read_snapshot(json_path, path=None):
+    """
+    Return the schema from json_path's snapshot, or None if it is missing,
+    stale (the JSON changed since it was taken) or fails its integrity check.
+    """
+    path = path or snapshot_path(json_path)
+    try:
+        st = os.stat(json_path)
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(MAGIC):
+        return None
+    try:
+        start = len(MAGIC) + _LENGTH.size
+        (length,) = _LENGTH.unpack_from(data, len(MAGIC))
+        header = json.loads(data[start : start + length])
+        payload = memoryview(data)[start + length :]
+        if (
+            header.get("version") != SNAPSHOT_VERSION
+            or header.get("source_size") != st.st_size
+            or header.get("source_mtime_ns") != st.st_mtime_ns
+            or hashlib.sha256(payload).hexdigest() != header.get("sha256")
+        ):
+            return None
+        return pickle.loads(payload)
+    except Exception:  # noqa: BLE001 - a damaged snapshot can raise anything
+        return None
+
+
+def load_schema(path):
+    """
+    Load a merged schema JSON file, preferring its snapshot when it is fresh.
+
+    Interned files written by ``merge.py --interned`` are expanded and
+    compressed files (see compressed.py) decompressed transparently.
+    """
+    if codec_of(path) is None:
+        schema = read_snapshot(path)
+        if schema is not None:
+            return schema
+    with open_text(path) as f:
+        schema = json.load(f)
+    return expand(schema) if is_interned(schema) else schema
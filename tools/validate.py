@@ -2,31 +2,34 @@
 import sys
 import json
 import argparse
+import os
 import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
 from pathlib import Path
-from jsonschema import Draft7Validator, RefResolver
-from ruamel.yaml import YAML
-from ruamel.yaml.error import YAMLError
-from ruamel.yaml.comments import CommentedMap
+from yaml import YAMLError
+
+from build_cache import build_key, sha256_bytes, sha256_file
+from compressed import open_text, strip_codec
+from schema_compiler import UnsupportedSchema, load_compiled, schema_digest
+from yaml_io import describe_backend, safe_load, safe_load_with_locations
 
 DEFAULT_SCHEMA_FILENAME = "dcs_yaml_schema.yaml"
-_yaml = YAML(typ="safe")
+DEFAULT_RESULT_CACHE = os.path.join(".cache", "validate-results.json")
+# Bump whenever cached reports change meaning so stale results are discarded.
+RESULT_CACHE_VERSION = 1
 
 
 def load_schema(path: Path):
-    with path.open("r", encoding="utf-8") as f:
-        return (
-            _yaml.load(f) if path.suffix.lower() in {".yaml", ".yml"} else json.load(f)
-        )
+    is_yaml = Path(strip_codec(path)).suffix.lower() in {".yaml", ".yml"}
+    with open_text(path) as f:
+        return safe_load(f) if is_yaml else json.load(f)
 
 
 def load_yaml(path: Path):
     with path.open("r", encoding="utf-8") as f:
-        return _yaml.load(f)
-
-
-def lc(node):
-    return (node.lc.line + 1, node.lc.col + 1) if hasattr(node, "lc") else (None, None)
+        return safe_load(f)
 
 
 def collect(paths):
@@ -54,24 +57,24 @@ def tree_lines(segs, msg, line=None, col=None):
     return lines
 
 
-def collect_errors(entry, validator, base=""):
+def collect_errors(entry, validator, base=(), locations=None):
+    return report_errors(validator.iter_errors(entry), base, locations)
+
+
+def report_errors(found, base=(), locations=None):
+    # locations maps key paths in the file to (line, col), see
+    # yaml_io.safe_load_with_locations
+    locations = locations or {}
     errs = []
-    for err in sorted(validator.iter_errors(entry), key=lambda e: (e.path, e.message)):
-        full_path = list(filter(None, base.split("/"))) + list(err.path)
-        line_num, c = lc(err.instance)
+    for err in sorted(found, key=lambda e: (e.path, e.message)):
+        full_path = [*base, *err.path]
+        line_num, c = locations.get(tuple(full_path), (None, None))
         errs.extend(tree_lines(full_path, err.message, line_num, c))
-        if err.validator == "additionalProperties" and isinstance(
-            err.instance, CommentedMap
-        ):
-            m = re.search(r"\((.*?)\s+were unexpected\)", err.message)
+        if err.validator == "additionalProperties" and locations:
+            m = re.search(r"\((.*?)\s+(?:was|were) unexpected\)", err.message)
             if m:
                 for k in [s.strip().strip("'\"") for s in m.group(1).split(",")]:
-                    info = err.instance.lc.key(k)
-                    kl, kc = (
-                        (info[0] + 1, info[1] + 1)
-                        if info and len(info) >= 2
-                        else (None, None)
-                    )
+                    kl, kc = locations.get((*full_path, k), (None, None))
                     errs.extend(
                         tree_lines(
                             full_path + [k], f"unexpected property '{k}'", kl, kc
@@ -81,6 +84,10 @@ def collect_errors(entry, validator, base=""):
 
 
 def build_validators(schema):
+    # Imported here: runs that use the compiled module or only replay cached
+    # results never need jsonschema, which is slow to import
+    from jsonschema import Draft7Validator, RefResolver
+
     resolver = RefResolver.from_schema(schema)
     return (
         Draft7Validator(schema, resolver=resolver),
@@ -89,27 +96,73 @@ def build_validators(schema):
     )
 
 
-def validate_file(fp, data, v_root, v_global, v_type):
+def load_validators(schema_path, compiled=True):
+    if compiled:
+        try:
+            module = load_compiled(schema_path, load_schema)
+            definitions = module.definitions
+            return module.root, definitions["globalEntry"], definitions["typeEntry"]
+        except (UnsupportedSchema, KeyError) as e:
+            print(f"⚠️ Cannot compile {schema_path} ({e}), using jsonschema")
+    return build_validators(load_schema(schema_path))
+
+
+# Entries of a file that is neither wrapped in globals/types nor stored under a
+# globals/ or types/ directory are routed by the parts of globalEntry and
+# typeEntry in dcs_yaml_schema.yaml that only one of them accepts. Properties
+# both accept differ only in their descriptions.
+GLOBAL_KINDS = {"class", "singleton"}
+TYPE_KINDS = {"union"}
+GLOBAL_KEYS = {
+    "environment",
+    "constants",
+    "static",
+    "instance",
+    "properties",
+    "inherits",
+}
+TYPE_KEYS = {"values", "fields", "anyOf"}
+
+
+def classify(data):
+    if not isinstance(data, dict):
+        return None
+    # A malformed kind (a list or mapping) is left to the schema to report
+    kind = data.get("kind") if isinstance(data.get("kind"), str) else None
+    if kind in GLOBAL_KINDS or not GLOBAL_KEYS.isdisjoint(data):
+        return "globals"
+    if kind in TYPE_KINDS or not TYPE_KEYS.isdisjoint(data):
+        return "types"
+    return "globals" if "kind" in data else None
+
+
+def validate_file(fp, data, v_root, v_global, v_type, stats=None, locations=None):
+    stats = Counter() if stats is None else stats
     errors = []
     if isinstance(data, dict) and ("globals" in data or "types" in data):
         if "globals" in data:
             for n, e in data["globals"].items():
-                errors.extend(collect_errors(e, v_global, f"globals/{n}"))
+                errors.extend(collect_errors(e, v_global, ("globals", n), locations))
+                stats["entries"] += 1
         if "types" in data:
             for n, e in data["types"].items():
-                errors.extend(collect_errors(e, v_type, f"types/{n}"))
+                errors.extend(collect_errors(e, v_type, ("types", n), locations))
+                stats["entries"] += 1
         return errors
     parts = {p.lower() for p in fp.parts}
-    validator = v_global if "globals" in parts else v_type if "types" in parts else None
-    if validator is None:
-        validator = (
-            v_global
-            if v_global.is_valid(data)
-            else v_type
-            if v_type.is_valid(data)
-            else v_root
-        )
-    errors.extend(collect_errors(data, validator))
+    section = "globals" if "globals" in parts else "types" if "types" in parts else None
+    classified = section is None
+    if classified:
+        section = classify(data)
+    validator = {"globals": v_global, "types": v_type}.get(section, v_root)
+    found = list(validator.iter_errors(data))
+    errors.extend(report_errors(found, locations=locations))
+    stats["entries"] += 1
+    if classified:
+        # Trying globalEntry, then typeEntry, took one is_valid pass for a valid
+        # global and two for anything else before the reporting pass
+        stats["classified"] += 1
+        stats["skipped"] += 1 if section == "globals" and not found else 2
     return errors
 
 
@@ -123,12 +176,212 @@ def resolve_schema(paths, explicit):
     return Path.cwd() / DEFAULT_SCHEMA_FILENAME
 
 
+def report(fp, errors):
+    if errors:
+        return False, [f"❌ {fp}"] + errors
+    return True, [f"✅ {fp}"]
+
+
+def check_file(fp, validators):
+    """
+    Parse and validate one file; returns ``(ok, lines, stats, digest)``.
+
+    digest is the SHA-256 of the content that was validated, or None if the
+    file could not be read or parsed.
+    """
+    stats = Counter()
+    try:
+        raw = fp.read_bytes()
+        data, locations = safe_load_with_locations(
+            raw.decode("utf-8"), unique_keys=True
+        )
+    except YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        loc = f" (line {mark.line + 1}, col {mark.column + 1})" if mark else ""
+        problem = e.problem if hasattr(e, "problem") else e
+        return False, [f"✖ YAML parse error in {fp}{loc}: {problem}"], stats, None
+    except Exception as e:
+        return False, [f"✖ Error reading {fp}: {e}"], stats, None
+
+    errs = validate_file(fp, data, *validators, stats=stats, locations=locations)
+    ok, lines = report(fp, [f"    {line}" for line in errs])
+    return ok, lines, stats, sha256_bytes(raw)
+
+
+def _jsonschema_version():
+    # Read from the package metadata: importing jsonschema is slow
+    try:
+        return metadata.version("jsonschema")
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def result_cache_key(schema_path, compiled=True):
+    """
+    Results are reused only with the same schema, validator and YAML loader.
+
+    The validator is the compiled module, identified by the compiler's source,
+    or jsonschema. The compiled module falls back to jsonschema for schemas it
+    cannot compile, so jsonschema's version is part of the key either way.
+    """
+    return build_key(
+        RESULT_CACHE_VERSION,
+        schema_digest(schema_path),
+        sha256_file(__file__),
+        sha256_file(sys.modules["yaml_io"].__file__),
+        describe_backend(),
+        sha256_file(sys.modules["schema_compiler"].__file__)
+        if compiled
+        else "jsonschema",
+        _jsonschema_version(),
+    )
+
+
+def load_result_cache(path, key):
+    """Load the validation result cache, returning an empty cache if unusable."""
+    empty = {"version": RESULT_CACHE_VERSION, "key": key, "files": {}}
+    if not path or not os.path.isfile(path):
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    if not isinstance(cache, dict) or cache.get("key") != key:
+        return empty
+    return cache
+
+
+def save_result_cache(path, cache):
+    """Atomically write the result cache, dropping results of deleted files."""
+    files = cache["files"]
+    for stale in [p for p in files if not os.path.isfile(p)]:
+        del files[stale]
+    cache_dir = os.path.dirname(path)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+# Validators of a worker process, built once by _init_worker
+_worker_validators = None
+
+
+def _init_worker(schema_path, compiled):
+    global _worker_validators
+    _worker_validators = load_validators(schema_path, compiled)
+
+
+def _check_in_worker(fp):
+    return check_file(fp, _worker_validators)
+
+
+def validate_paths(
+    files, schema_path, quiet=False, jobs=1, compiled=True, stats=None, cache_path=None
+):
+    """
+    Validate files and print their reports in order; True if all passed.
+
+    With cache_path, the report of a file whose content, schema and validator
+    are unchanged since an earlier run is replayed from the result cache, and
+    only the other files are parsed and validated.
+    """
+    # Cached results are keyed by absolute path, because where a bare entry is
+    # stored decides which definition it is validated against
+    cache, hits = None, [None] * len(files)
+    if cache_path:
+        cache = load_result_cache(cache_path, result_cache_key(schema_path, compiled))
+        for i, fp in enumerate(files):
+            entry = cache["files"].get(os.path.abspath(fp))
+            if entry and entry["sha256"] == sha256_file(fp):
+                hits[i] = entry["errors"]
+    pending = [fp for fp, hit in zip(files, hits) if hit is None]
+
+    if jobs > 1 and len(pending) > 1:
+        workers = min(jobs, len(pending))
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(schema_path, compiled),
+        )
+        # map() yields in submission order, so the report matches a serial run
+        checked = pool.map(
+            _check_in_worker, pending, chunksize=max(1, len(pending) // (workers * 4))
+        )
+    else:
+        pool = None
+        validators = load_validators(schema_path, compiled) if pending else None
+        checked = (check_file(fp, validators) for fp in pending)
+
+    all_ok, written = True, False
+    try:
+        for fp, hit in zip(files, hits):
+            if hit is not None:
+                ok, lines = report(fp, hit)
+                file_stats = Counter(cached=1)
+            else:
+                ok, lines, file_stats, digest = next(checked)
+                if cache is not None and digest is not None:
+                    entry = {"sha256": digest, "errors": lines[1:]}
+                    cache["files"][os.path.abspath(fp)] = entry
+                    written = True
+            if stats is not None:
+                stats.update(file_stats)
+            if not ok:
+                all_ok = False
+            if not ok or not quiet:
+                for line in lines:
+                    print(line)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if written:
+        try:
+            save_result_cache(cache_path, cache)
+        except OSError as e:
+            print(f"⚠️ Could not write result cache {cache_path}: {e}")
+    return all_ok
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("target", nargs="?", default=".")
     ap.add_argument("--schema")
     ap.add_argument("-q", "--quiet", action="store_true")
+    ap.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for parsing and validation (0 = one per CPU)",
+    )
+    ap.add_argument(
+        "--no-compile",
+        dest="compiled",
+        action="store_false",
+        help="Validate with the interpreted jsonschema validators instead of the "
+        "module compiled from the schema",
+    )
+    ap.add_argument(
+        "--cache",
+        default=DEFAULT_RESULT_CACHE,
+        help="Result cache file (default: %(default)s); files unchanged since an "
+        "earlier run are not revalidated",
+    )
+    ap.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_const",
+        const=None,
+        help="Validate every file regardless of the result cache",
+    )
+    ap.add_argument("-v", "--verbose", action="store_true")
     args = ap.parse_args()
+    if args.verbose:
+        print(f"YAML backend: {describe_backend()}")
 
     paths = [args.target]
     schema_path = resolve_schema(paths, args.schema)
@@ -141,37 +394,23 @@ def main():
         print("✖ No YAML files found")
         sys.exit(1)
 
-    root_schema = load_schema(schema_path)
-    v_root, v_global, v_type = build_validators(root_schema)
-
-    all_ok = True
-    for fp in files:
-        try:
-            data = load_yaml(fp)
-        except YAMLError as e:
-            mark = getattr(e, "problem_mark", None)
-            loc = f" (line {mark.line + 1}, col {mark.column + 1})" if mark else ""
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    stats = Counter()
+    ok = validate_paths(
+        files, schema_path, args.quiet, jobs, args.compiled, stats, args.cache
+    )
+    if args.verbose:
+        if args.cache:
             print(
-                f"✖ YAML parse error in {fp}{loc}: {e.problem if hasattr(e, 'problem') else e}"
+                f"Result cache: {stats['cached']} hit(s), "
+                f"{len(files) - stats['cached']} validated"
             )
-            all_ok = False
-            continue
-        except Exception as e:
-            print(f"✖ Error reading {fp}: {e}")
-            all_ok = False
-            continue
-
-        errs = validate_file(fp, data, v_root, v_global, v_type)
-        if errs:
-            print(f"❌ {fp}")
-            for line in errs:
-                print(f"    {line}")
-            all_ok = False
-        else:
-            if not args.quiet:
-                print(f"✅ {fp}")
-
-    sys.exit(0 if all_ok else 1)
+        print(
+            f"Validated {stats['entries']} entries in one pass each; "
+            f"{stats['classified']} routed by kind and keys, "
+            f"{stats['skipped']} trial validation(s) skipped"
+        )
+    sys.exit(0 if ok else 1)
 
 
 if __name__ == "__main__":
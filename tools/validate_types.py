@@ -1,9 +1,12 @@
 import argparse
-import json
 import sys
 import os
 from typing import Any, Dict, List, Set
-import yaml
+
+from compressed import open_text, strip_codec
+from provenance import load_fresh_provenance, load_provenance, split_pointer
+from snapshot import load_schema
+from yaml_io import describe_backend, safe_load
 
 PRIMITIVES: Set[str] = {
     "number",
@@ -25,10 +28,10 @@ EXPLICITLY_IGNORED_TYPES = {
 
 
 def load_spec(path: str) -> Any:
-    with open(path, "r", encoding="utf-8") as f:
-        if path.endswith((".yaml", ".yml")):
-            return yaml.safe_load(f)
-        return json.load(f)
+    if strip_codec(path).endswith((".yaml", ".yml")):
+        with open_text(path) as f:
+            return safe_load(f)
+    return load_schema(path)
 
 
 def split_union(t: str) -> List[str]:
@@ -88,8 +91,20 @@ def find_duplicate_types(spec: Any) -> Set[str]:
     return dup
 
 
-def collect_ignored_types(src_root: str) -> Set[str]:
+def collect_ignored_types(src_root: str, provenance: dict | None = None) -> Set[str]:
     ignored: Set[str] = set()
+    if provenance is not None:
+        # Answer from the merge's provenance index instead of re-reading sources:
+        # a type is ignored if any file under an ignored directory defines it
+        prefixes = tuple(rel + "/" for rel in IGNORED_RELATIVE_DIRS)
+        files = provenance["files"]
+        for pointer, file_indexes in provenance["entries"].items():
+            tokens = split_pointer(pointer)
+            if tokens[0] == "types" and any(
+                files[i].startswith(prefixes) for i in file_indexes
+            ):
+                ignored.add(tokens[1])
+        return ignored
     for rel in IGNORED_RELATIVE_DIRS:
         dir_path = os.path.join(src_root, rel)
         if os.path.isdir(dir_path):
@@ -109,20 +124,7 @@ def collect_ignored_types(src_root: str) -> Set[str]:
     return ignored
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-
-    parser.add_argument("spec", nargs="?", default="dcs-world-api-schema.json")
-
-    parser.add_argument("--src", default="dcs-world-schema")
-
-    args = parser.parse_args()
-
-    try:
-        spec = load_spec(args.spec)
-    except FileNotFoundError:
-        print(f"Spec file not found: {args.spec}", file=sys.stderr)
-        sys.exit(1)
+def check_types(spec: Any, src_root: str, provenance: dict | None = None) -> bool:
     defined_types: Set[str] = set(spec.get("types", {}).keys())
     defined_globals: Set[str] = set(spec.get("globals", {}).keys())
     allowed: Set[str] = defined_types | defined_globals | PRIMITIVES
@@ -130,7 +132,7 @@ def main() -> None:
     missing = {t: paths for t, paths in refs.items() if t not in allowed}
     duplicates = find_duplicate_types(spec)
     referenced = {t for t in refs if t in defined_types}
-    ignored_types = collect_ignored_types(args.src)
+    ignored_types = collect_ignored_types(src_root, provenance)
     unused = {
         t
         for t in defined_types
@@ -158,9 +160,43 @@ def main() -> None:
         for t in sorted(unused):
             print(f"- {t}")
     if issues:
-        sys.exit(1)
+        return False
     print("All type definitions are valid, unique, and used.")
-    sys.exit(0)
+    return True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("spec", nargs="?", default="dcs-world-api-schema.json")
+
+    parser.add_argument("--src", default="dcs-world-schema")
+
+    parser.add_argument(
+        "--provenance",
+        help="Provenance index from merge.py --provenance (default: a fresh "
+        "<spec>.provenance.json sidecar if present, else the source tree is read)",
+    )
+
+    parser.add_argument("-v", "--verbose", action="store_true")
+
+    args = parser.parse_args()
+    if args.verbose:
+        print(f"YAML backend: {describe_backend()}")
+
+    try:
+        spec = load_spec(args.spec)
+    except FileNotFoundError:
+        print(f"Spec file not found: {args.spec}", file=sys.stderr)
+        sys.exit(1)
+    if args.provenance:
+        provenance = load_provenance(args.provenance)
+        if provenance is None:
+            print(f"Unusable provenance index: {args.provenance}", file=sys.stderr)
+            sys.exit(1)
+    else:
+        provenance = load_fresh_provenance(args.spec)
+    sys.exit(0 if check_types(spec, args.src, provenance) else 1)
 
 
 if __name__ == "__main__":
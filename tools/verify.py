@@ -3,6 +3,9 @@ import argparse
 import sys
 from typing import Dict, Set, Any, List
 
+from compressed import open_text
+from snapshot import load_schema
+
 IGNORED_METHODS = {
     "__eq",
     "__index",
@@ -173,18 +176,21 @@ def compare(schema_s: Dict[str, Set[str]], dcs_s: Dict[str, Set[str]]):
     return missing_namespace or missing_members
 
 
+def verify_schema(schema: dict[str, Any], api: dict[str, Any]) -> bool:
+    schema_s = extract_schema(schema, api)
+    dcs_s = extract_dcs(api)
+    return compare(schema_s, dcs_s)
+
+
 def main():
     p = argparse.ArgumentParser()
     p.add_argument("schema_file")
     p.add_argument("dcs_api_file")
     a = p.parse_args()
-    with open(a.schema_file, "r", encoding="utf-8") as f:
-        schema = json.load(f)
-    with open(a.dcs_api_file, "r", encoding="utf-8") as f:
+    schema = load_schema(a.schema_file)
+    with open_text(a.dcs_api_file) as f:
         api = json.load(f)
-    schema_s = extract_schema(schema, api)
-    dcs_s = extract_dcs(api)
-    errors_found = compare(schema_s, dcs_s)
+    errors_found = verify_schema(schema, api)
 
     # Exit with code 1 if errors were found, 0 otherwise
     sys.exit(1 if errors_found else 0)
@@ -0,0 +1,404 @@
+"""
+Shared PyYAML loader and dumper selection for the schema tools.
+
+Prefers the LibYAML-backed ``CSafeLoader``/``CSafeDumper`` when PyYAML was built
+with them and falls back to the pure-Python ``SafeLoader``/``SafeDumper``
+otherwise. Both backends load identical trees; the C emitter may wrap long
+scalars differently, but the dumped documents parse back to the same data.
+"""
+
+from collections.abc import Hashable
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+
+    BACKEND = "libyaml"
+except ImportError:
+    from yaml import SafeDumper, SafeLoader
+
+    BACKEND = "pure-python"
+
+
+def safe_load(stream, loader=SafeLoader):
+    """Load a single YAML document using the fastest available safe loader."""
+    return yaml.load(stream, Loader=loader)
+
+
+def safe_dump(data, stream=None, dumper=SafeDumper, **kwargs):
+    """Dump data using the fastest available safe dumper."""
+    return yaml.dump(data, stream, Dumper=dumper, **kwargs)
+
+
+_STR_TAG = "tag:yaml.org,2002:str"
+_MERGE_TAG = "tag:yaml.org,2002:merge"
+_NULL_TAG = "tag:yaml.org,2002:null"
+_COLLECTION_TAGS = {
+    yaml.MappingStartEvent: (yaml.MappingNode, "tag:yaml.org,2002:map"),
+    yaml.SequenceStartEvent: (yaml.SequenceNode, "tag:yaml.org,2002:seq"),
+}
+_END_EVENTS = (yaml.MappingEndEvent, yaml.SequenceEndEvent)
+# Key placeholders of a mapping under construction
+_NO_KEY = object()
+_MERGE_KEY = object()
+
+
+class _Frame:
+    """A mapping or sequence under construction."""
+
+    __slots__ = (
+        "first",
+        "key",
+        "key_mark",
+        "merges",
+        "path",
+        "span",
+        "start_mark",
+        "value",
+    )
+
+    def __init__(self, value, path, start_mark, first):
+        self.value = value
+        self.path = path
+        self.start_mark = start_mark
+        # Index in the document's location order where this subtree starts
+        self.first = first
+        self.key = _NO_KEY
+        self.key_mark = None
+        self.merges = None
+        self.span = None
+
+
+def _construct_scalar(parser, event):
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = parser.resolve(yaml.ScalarNode, event.value, event.implicit)
+    if tag == _STR_TAG or tag == _MERGE_TAG:
+        return tag, event.value
+    node = yaml.ScalarNode(
+        tag, event.value, event.start_mark, event.end_mark, event.style
+    )
+    constructor = parser.yaml_constructors.get(tag)
+    if constructor is None:
+        # Multi-constructors and the error for unknown tags
+        return tag, parser.construct_object(node)
+    return tag, constructor(parser, node)
+
+
+def _check_anchor(event, marks):
+    """Record where an anchor is defined; like PyYAML, refuse to redefine it."""
+    first = marks.get(event.anchor)
+    if first is not None:
+        raise yaml.composer.ComposerError(
+            f"found duplicate anchor {event.anchor!r}; first occurrence",
+            first,
+            "second occurrence",
+            event.start_mark,
+        )
+    marks[event.anchor] = event.start_mark
+
+
+def _compose_node(parser, event, anchors, nodes, marks):
+    """Compose the node starting with event, as yaml.composer.Composer does."""
+    if type(event) is yaml.AliasEvent:
+        if event.anchor in nodes:
+            return nodes[event.anchor]
+        if event.anchor not in anchors:
+            raise _undefined_alias(event)
+        # Anchored outside the tagged collection: already constructed
+        node = yaml.ScalarNode(_NULL_TAG, "", event.start_mark, event.end_mark)
+        parser.constructed_objects[node] = anchors[event.anchor]
+        return node
+    tag = event.tag
+    if type(event) is yaml.ScalarEvent:
+        if tag is None or tag == "!":
+            tag = parser.resolve(yaml.ScalarNode, event.value, event.implicit)
+        node = yaml.ScalarNode(
+            tag, event.value, event.start_mark, event.end_mark, event.style
+        )
+    else:
+        node_type = _COLLECTION_TAGS[type(event)][0]
+        if tag is None or tag == "!":
+            tag = parser.resolve(node_type, None, event.implicit)
+        node = node_type(tag, [], event.start_mark, None, event.flow_style)
+    if event.anchor is not None:
+        nodes[event.anchor] = node
+
+    def compose_child():
+        child = parser.get_event()
+        if type(child) is not yaml.AliasEvent and child.anchor is not None:
+            _check_anchor(child, marks)
+        return _compose_node(parser, child, anchors, nodes, marks)
+
+    if type(event) is yaml.MappingStartEvent:
+        while not parser.check_event(yaml.MappingEndEvent):
+            key = compose_child()
+            node.value.append((key, compose_child()))
+    elif type(event) is yaml.SequenceStartEvent:
+        while not parser.check_event(yaml.SequenceEndEvent):
+            node.value.append(compose_child())
+    if type(event) is not yaml.ScalarEvent:
+        node.end_mark = parser.get_event().end_mark
+    return node
+
+
+def _construct_tagged(parser, event, anchors, marks):
+    """
+    Build a collection with a non-default tag (``!!set``, ``!!omap``, ...).
+
+    Its events are composed into nodes and constructed by the loader's own
+    constructors, like safe_load does. Returns the value and the values of the
+    anchors defined inside it.
+    """
+    nodes = {}
+    try:
+        node = _compose_node(parser, event, anchors, nodes, marks)
+        value = parser.construct_object(node, deep=True)
+        inner = {
+            anchor: parser.construct_object(inner_node, deep=True)
+            for anchor, inner_node in nodes.items()
+        }
+    finally:
+        parser.constructed_objects = {}
+        parser.recursive_objects = {}
+    return value, inner
+
+
+def _apply_merges(frame, locations, order):
+    """
+    Resolve ``<<`` keys the way SafeConstructor.flatten_mapping does.
+
+    Merged entries are located where the mapping that supplied them was.
+    """
+    sources = []  # (mapping, path its entries were located under), lowest first
+    for value, mark, path in frame.merges:
+        if isinstance(value, dict):
+            sources.append((value, path))
+            continue
+        if not isinstance(value, list):
+            raise yaml.constructor.ConstructorError(
+                "while constructing a mapping",
+                frame.start_mark,
+                "expected a mapping or list of mappings for merging, but found scalar",
+                mark,
+            )
+        for i in reversed(range(len(value))):
+            if not isinstance(value[i], dict):
+                found = "sequence" if isinstance(value[i], list) else "scalar"
+                raise yaml.constructor.ConstructorError(
+                    "while constructing a mapping",
+                    frame.start_mark,
+                    f"expected a mapping for merging, but found {found}",
+                    mark,
+                )
+            sources.append((value[i], None if path is None else path + (i,)))
+
+    own = dict(frame.value)
+    frame.value.clear()
+    winners = {}
+    for mapping, path in sources:
+        frame.value.update(mapping)
+        winners.update(dict.fromkeys(mapping, path))
+    frame.value.update(own)
+    if frame.path is None:
+        return
+    # Merge values were located under frame.path + (_MERGE_KEY, n), within
+    # this mapping's own part of the location order
+    prefix = frame.path + (_MERGE_KEY,)
+    depth = len(prefix)
+    source_paths = {path for _, path in sources}
+    staged = [p for p in order[frame.first :] if p[:depth] == prefix]
+    for located in staged:
+        # A mapping merged directly, or one item of a merged list
+        for end in (depth + 1, depth + 2):
+            if located[:end] in source_paths:
+                break
+        else:
+            continue
+        key = located[end:][:1]
+        if key and key[0] not in own and winners.get(key[0]) == located[:end]:
+            path = frame.path + located[end:]
+            locations[path] = locations[located]
+            order.append(path)
+    for located in staged:
+        locations.pop(located, None)
+
+
+def safe_load_with_locations(stream, loader=SafeLoader, unique_keys=False):
+    """
+    Load a single YAML document and record where each node starts.
+
+    Returns ``(data, locations)``. data holds the same plain dicts, lists and
+    scalars as safe_load. locations maps the path of every node below the
+    root, as a tuple of mapping keys and list indexes into data (the decoded
+    tokens of its JSON pointer), to its 1-based ``(line, column)``. Mapping
+    entries point at their key.
+
+    The tree is built straight from the parser's events, so no node graph is
+    composed and walked a second time. Entries merged in with ``<<`` are
+    located where they are defined. An alias is located where it is used and
+    the nodes below it where the anchored original defines them. With
+    ``unique_keys``, a key repeated within one mapping raises a
+    ConstructorError instead of silently overriding the earlier value.
+    Collections with other tags (``!!set``, ``!!omap``, ``!!pairs``) are built
+    by the loader's constructors; the nodes inside them are not located.
+    """
+    parser = loader(stream)
+    try:
+        parser.get_event()
+        if parser.check_event(yaml.StreamEndEvent):
+            return None, {}
+        document = parser.get_event()
+        data, locations = _build_document(parser, unique_keys)
+        parser.get_event()
+        if not parser.check_event(yaml.StreamEndEvent):
+            raise yaml.composer.ComposerError(
+                "expected a single document in the stream",
+                document.start_mark,
+                "but found another document",
+                parser.get_event().start_mark,
+            )
+        return data, locations
+    finally:
+        parser.dispose()
+
+
+def _undefined_alias(event):
+    return yaml.composer.ComposerError(
+        None, None, f"found undefined alias {event.anchor!r}", event.start_mark
+    )
+
+
+def _build_document(parser, unique_keys):
+    # order lists located paths in document order, so the locations below a
+    # node are the slice recorded while it was open; spans maps each anchor
+    # to [path, start, end] of that slice (end is None until it closes)
+    locations, order = {}, []
+    anchors, spans, marks = {}, {}, {}
+    frames = []
+    while True:
+        event = parser.get_event()
+        event_type = type(event)
+        frame = frames[-1] if frames else None
+
+        if event_type in _END_EVENTS:
+            frames.pop()
+            if frame.merges:
+                _apply_merges(frame, locations, order)
+            if frame.span is not None:
+                frame.span[2] = len(order)
+            if not frames:
+                return frame.value, locations
+            continue
+
+        if frame is not None and frame.key is _NO_KEY and type(frame.value) is dict:
+            # A mapping key; its value is the next node
+            tag, key = None, []  # collections cannot be keys
+            if event_type is yaml.ScalarEvent:
+                tag, key = _construct_scalar(parser, event)
+                if event.anchor is not None:
+                    _check_anchor(event, marks)
+                    anchors[event.anchor] = key
+            elif event_type is yaml.AliasEvent:
+                if event.anchor not in anchors:
+                    raise _undefined_alias(event)
+                key = anchors[event.anchor]
+            if not isinstance(key, Hashable):
+                raise yaml.constructor.ConstructorError(
+                    "while constructing a mapping",
+                    frame.start_mark,
+                    "found unhashable key",
+                    event.start_mark,
+                )
+            if tag == _MERGE_TAG:
+                key = _MERGE_KEY
+            elif unique_keys and key in frame.value:
+                raise yaml.constructor.ConstructorError(
+                    "while constructing a mapping",
+                    frame.start_mark,
+                    f'found duplicate key "{key}"',
+                    event.start_mark,
+                )
+            frame.key, frame.key_mark = key, event.start_mark
+            continue
+
+        # A value: the document root, a sequence item or a mapping value
+        if frame is None:
+            path, mark = (), None
+        elif type(frame.value) is list:
+            path = None if frame.path is None else frame.path + (len(frame.value),)
+            mark = event.start_mark
+        elif frame.key is _MERGE_KEY:
+            path = frame.path
+            if path is not None:
+                path += (_MERGE_KEY, len(frame.merges or ()))
+            mark = None
+        else:
+            path = None if frame.path is None else frame.path + (frame.key,)
+            mark = frame.key_mark
+        if path and mark is not None:
+            locations[path] = (mark.line + 1, mark.column + 1)
+            order.append(path)
+        if event_type is not yaml.AliasEvent and event.anchor is not None:
+            _check_anchor(event, marks)
+
+        if event_type is yaml.ScalarEvent:
+            value = _construct_scalar(parser, event)[1]
+            child = None
+        elif event_type is yaml.AliasEvent:
+            if event.anchor not in anchors:
+                raise _undefined_alias(event)
+            value, child = anchors[event.anchor], None
+            source, start, end = spans.get(event.anchor, (None, 0, 0))
+            if path is not None and source is not None:
+                depth = len(source)
+                for located in order[start:end]:
+                    # Entries staged for a merge are gone once it is applied
+                    if located in locations:
+                        order.append(path + located[depth:])
+                        locations[order[-1]] = locations[located]
+        else:
+            node_type, default_tag = _COLLECTION_TAGS[event_type]
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = parser.resolve(node_type, None, event.implicit)
+            if tag != default_tag:
+                value, inner = _construct_tagged(parser, event, anchors, marks)
+                anchors.update(inner)
+                child = None
+            else:
+                value = {} if event_type is yaml.MappingStartEvent else []
+                child = _Frame(value, path, event.start_mark, len(order))
+
+        if event_type is not yaml.AliasEvent and event.anchor is not None:
+            anchors[event.anchor] = value
+            spans[event.anchor] = [
+                path,
+                len(order),
+                len(order) if child is None else None,
+            ]
+            if child is not None:
+                child.span = spans[event.anchor]
+
+        if frame is None:
+            if child is None:
+                return value, locations
+        elif type(frame.value) is list:
+            frame.value.append(value)
+        elif frame.key is _MERGE_KEY:
+            if frame.merges is None:
+                frame.merges = []
+            frame.merges.append((value, event.start_mark, path))
+            frame.key = _NO_KEY
+        else:
+            frame.value[frame.key] = value
+            frame.key = _NO_KEY
+        if child is not None:
+            frames.append(child)
+
+
+def describe_backend():
+    """Human-readable description of the active backend, for --verbose output."""
+    return f"PyYAML {yaml.__version__} ({BACKEND})"